@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import ManagerVisibility
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized manager-to-member visibility table'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            ManagerVisibility.rebuild()
+        self.stdout.write(f'Rebuilt {ManagerVisibility.objects.count()} manager visibility rows')
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_visibility(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    ManagerVisibility = apps.get_model('accounts', 'ManagerVisibility')
+    pairs = User.objects.filter(team__isnull=False).values_list('team__manager_id', 'id')
+    ManagerVisibility.objects.bulk_create(
+        (ManagerVisibility(manager_id=manager_id, member_id=member_id) for manager_id, member_id in pairs),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_team_user_team'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ManagerVisibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('manager', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='member_visibility', to=settings.AUTH_USER_MODEL)),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='manager_visibility', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['member', 'manager'], name='visibility_member_idx')],
+                'unique_together': {('manager', 'member')},
+            },
+        ),
+        migrations.RunPython(populate_visibility, migrations.RunPython.noop),
+    ]
@@ -22,16 +22,68 @@ class User(AbstractUser):
     def get_team_members(self):
         """Get all team members if user is a manager"""
         if self.role == 'manager':
-            return User.objects.filter(team__in=self.managed_teams.all())
+            return User.objects.filter(manager_visibility__manager=self)
         elif self.team:
             return User.objects.filter(team=self.team)
         return User.objects.none()
 
+    def get_visible_user_ids(self):
+        """Ids of the users get_team_members() returns, loaded once per instance"""
+        if not hasattr(self, '_visible_user_ids'):
+            if self.role == 'manager':
+                ids = ManagerVisibility.objects.filter(manager=self).values_list('member_id', flat=True)
+            elif self.team_id:
+                ids = User.objects.filter(team_id=self.team_id).values_list('id', flat=True)
+            else:
+                ids = []
+            self._visible_user_ids = frozenset(ids)
+        return self._visible_user_ids
+
     def is_team_member(self, other_user):
         """Check if another user is in the same team"""
         if self.role == 'manager':
             # Check if other_user's team is among the teams this manager manages
-            if other_user.team:
-                return self.managed_teams.filter(id=other_user.team.id).exists()
-            return False
-        return self.team == other_user.team and self.team is not None
\ No newline at end of file
+            return other_user.pk in self.get_visible_user_ids()
+        return self.team == other_user.team and self.team is not None
+
+class ManagerVisibility(models.Model):
+    """
+    Materialized (manager, member) pairs for every user in a team a manager
+    runs, so scoping a manager's view is a single indexed join.
+
+    Kept current by the signals in accounts.signals; rebuild with the
+    rebuild_manager_visibility command after bulk updates that bypass them.
+    """
+    manager = models.ForeignKey(User, on_delete=models.CASCADE, related_name='member_visibility')
+    member = models.ForeignKey(User, on_delete=models.CASCADE, related_name='manager_visibility')
+
+    class Meta:
+        unique_together = ['manager', 'member']
+        indexes = [
+            models.Index(fields=['member', 'manager'], name='visibility_member_idx'),
+        ]
+
+    @classmethod
+    def sync_member(cls, user):
+        cls.objects.filter(member=user).delete()
+        if user.team_id:
+            manager_id = Team.objects.filter(pk=user.team_id).values_list('manager_id', flat=True).first()
+            if manager_id:
+                cls.objects.create(manager_id=manager_id, member=user)
+
+    @classmethod
+    def sync_team(cls, team):
+        cls.objects.filter(member__team=team).delete()
+        cls.objects.bulk_create([
+            cls(manager_id=team.manager_id, member_id=member_id)
+            for member_id in team.members.values_list('id', flat=True)
+        ])
+
+    @classmethod
+    def rebuild(cls):
+        cls.objects.all().delete()
+        pairs = User.objects.filter(team__isnull=False).values_list('team__manager_id', 'id')
+        cls.objects.bulk_create(
+            (cls(manager_id=manager_id, member_id=member_id) for manager_id, member_id in pairs),
+            batch_size=1000,
+        )
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from .models import User, Team
+from core.serializers import SparseFieldsetMixin
 
 User = get_user_model()
 
@@ -36,7 +37,7 @@ class UserLoginSerializer(serializers.Serializer):
             }
         raise serializers.ValidationError('Invalid credentials')
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     manager_name = serializers.CharField(source='manager.username', read_only=True)
     member_count = serializers.SerializerMethodField()
 
@@ -47,7 +48,7 @@ class TeamSerializer(serializers.ModelSerializer):
     def get_member_count(self, obj):
         return obj.members.count()
 
-class UserDetailSerializer(serializers.ModelSerializer):
+class UserDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     team_name = serializers.CharField(source='team.name', read_only=True)
     team_id = serializers.IntegerField(source='team.id', read_only=True)
 
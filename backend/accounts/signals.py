@@ -0,0 +1,37 @@
+from django.db.models.signals import post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import ManagerVisibility, Team, User
+
+
+@receiver(post_init, sender=User)
+def remember_user_team(sender, instance, **kwargs):
+    # Read from __dict__ so deferred loads don't trigger a query
+    instance._loaded_team_id = instance.__dict__.get('team_id')
+
+
+@receiver(post_save, sender=User)
+def sync_user_visibility(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'team' not in update_fields and 'team_id' not in update_fields:
+        return
+    if created or instance.team_id != instance._loaded_team_id:
+        ManagerVisibility.sync_member(instance)
+    instance._loaded_team_id = instance.team_id
+
+
+@receiver(post_init, sender=Team)
+def remember_team_manager(sender, instance, **kwargs):
+    instance._loaded_manager_id = instance.__dict__.get('manager_id')
+
+
+@receiver(post_save, sender=Team)
+def sync_team_visibility(sender, instance, created, **kwargs):
+    if not created and instance.manager_id != instance._loaded_manager_id:
+        ManagerVisibility.sync_team(instance)
+    instance._loaded_manager_id = instance.manager_id
+
+
+@receiver(pre_delete, sender=Team)
+def clear_team_visibility(sender, instance, **kwargs):
+    # Members are detached with a queryset update, which sends no signals
+    ManagerVisibility.objects.filter(member__team=instance).delete()
@@ -13,6 +13,7 @@ from .serializers import (
     TeamSerializer, PasswordResetRequestSerializer, PasswordResetConfirmSerializer
 )
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from core.mixins import apply_eager_loading
 
 User = get_user_model()
 
@@ -65,8 +66,9 @@ class UserListView(APIView):
         # Only admin and manager can view all users
         if request.user.role not in ['admin', 'manager']:
             return Response({'detail': 'Permission denied.'}, status=status.HTTP_403_FORBIDDEN)
-        users = User.objects.all()
-        serializer = UserDetailSerializer(users, many=True)
+        context = {'request': request}
+        users = apply_eager_loading(User.objects.all(), UserDetailSerializer(context=context))
+        serializer = UserDetailSerializer(users, many=True, context=context)
         return Response(serializer.data)
 
 class UserDetailByIdView(APIView):
@@ -88,8 +90,9 @@ class TeamListView(APIView):
         # Only admin can view all teams
         if request.user.role != 'admin':
             return Response({'detail': 'Permission denied.'}, status=status.HTTP_403_FORBIDDEN)
-        teams = Team.objects.all()
-        serializer = TeamSerializer(teams, many=True)
+        context = {'request': request}
+        teams = apply_eager_loading(Team.objects.all(), TeamSerializer(context=context))
+        serializer = TeamSerializer(teams, many=True, context=context)
         return Response(serializer.data)
 
 class ManagerTeamView(APIView):
@@ -117,12 +120,16 @@ class ManagerTeamView(APIView):
             print(f"User {request.user.username} (role: {request.user.role}) manages {managed_teams.count()} teams")
             
             # Get all team members from managed teams
-            team_members = User.objects.filter(team__in=managed_teams).select_related('team')
+            context = {'request': request}
+            team_members = apply_eager_loading(
+                User.objects.filter(team__in=managed_teams),
+                UserDetailSerializer(context=context),
+            )
             
             print(f"Found {team_members.count()} team members")
             
             # Return empty list if no team members (this is valid)
-            serializer = UserDetailSerializer(team_members, many=True)
+            serializer = UserDetailSerializer(team_members, many=True, context=context)
             return Response(serializer.data, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CommentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'comments'
+
+    def ready(self):
+        from core import events, search
+        from .models import Comment
+        from .permissions import CommentPolicy
+        from .serializers import CommentSerializer
+
+        search.register('comment', Comment, title=None, body='content', policy=CommentPolicy())
+        events.register('comment', Comment, CommentSerializer, policy=CommentPolicy())
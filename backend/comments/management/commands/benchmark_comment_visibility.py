@@ -0,0 +1,123 @@
+import random
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from accounts.models import User
+from comments.models import Comment
+from comments.permissions import CommentPolicy
+from projects.models import Project, Task
+
+BENCHMARK_PREFIX = '__visibility_benchmark__'
+FULL_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on comments_comment\b'),
+    # SQLite says SEARCH for index lookups and SCAN for walking a whole table or index
+    'sqlite': re.compile(r'\bSCAN comments_comment\b'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare the OR + distinct comment visibility query with the UNION-based one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=1_000_000, help='Number of comments to benchmark against')
+        parser.add_argument('--users', type=int, default=500, help='Number of developers sharing them')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (median is reported)')
+        parser.add_argument('--show-plans', action='store_true', help='Print both query plans')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated data afterwards')
+
+    def handle(self, *args, **options):
+        users = self.seed(options['comments'], options['users'])
+        user = users[len(users) // 2]
+        repeat = options['repeat']
+
+        legacy = Comment.objects.filter(
+            Q(user=user) | Q(task__assigned_to=user) | Q(task__project__owner=user)
+        ).distinct()
+        union = CommentPolicy().filter_queryset(Comment.objects.all(), user)
+        full_scan = FULL_SCAN_PATTERNS.get(connection.vendor)
+
+        self.stdout.write(
+            f'{Comment.objects.count()} comments; developer {user.username} sees {union.count()}; '
+            f'median of {repeat} runs'
+        )
+        self.stdout.write(f'{"query":>8} {"first page ms":>14} {"count ms":>10} {"full scan":>10}')
+        for name, queryset in [('or', legacy), ('union', union)]:
+            page = queryset.order_by('-created_at', '-id')[:50]
+            page_ms = self.measure(lambda: list(page.all()), repeat)
+            count_ms = self.measure(queryset.count, repeat)
+            plans = [page.explain(), queryset.order_by().explain()]
+            scans = 'n/a' if full_scan is None else ('yes' if any(full_scan.search(plan) for plan in plans) else 'no')
+            self.stdout.write(f'{name:>8} {page_ms:>14.2f} {count_ms:>10.2f} {scans:>10}')
+            if options['show_plans']:
+                self.stdout.write('\n\n'.join(plans))
+
+        if not options['keep']:
+            self.stdout.write('Removing benchmark data...')
+            self.cleanup()
+
+    def seed(self, count, user_count):
+        users = list(User.objects.filter(username__startswith=BENCHMARK_PREFIX).order_by('id'))
+        if len(users) < user_count:
+            User.objects.bulk_create(
+                User(username=f'{BENCHMARK_PREFIX}{i}', role='developer')
+                for i in range(len(users), user_count)
+            )
+            users = list(User.objects.filter(username__startswith=BENCHMARK_PREFIX).order_by('id'))
+
+        rng = random.Random(42)
+        projects = list(Project.objects.filter(name__startswith=BENCHMARK_PREFIX))
+        if not projects:
+            Project.objects.bulk_create(
+                Project(name=f'{BENCHMARK_PREFIX}{i}', owner=rng.choice(users)) for i in range(100)
+            )
+            projects = list(Project.objects.filter(name__startswith=BENCHMARK_PREFIX))
+
+        tasks = list(Task.objects.filter(project__in=projects).values_list('id', flat=True))
+        if not tasks:
+            Task.objects.bulk_create(
+                (
+                    Task(
+                        title=f'Visibility task {i}', project=rng.choice(projects),
+                        assigned_to=rng.choice(users), status='todo',
+                    )
+                    for i in range(max(count // 50, 1))
+                ),
+                batch_size=10_000,
+            )
+            tasks = list(Task.objects.filter(project__in=projects).values_list('id', flat=True))
+
+        existing = Comment.objects.filter(task__project__in=projects).count()
+        batch_size = 10_000
+        if existing < count:
+            self.stdout.write(f'Creating {count - existing} benchmark comments...')
+        for start in range(existing, count, batch_size):
+            with transaction.atomic():
+                Comment.objects.bulk_create(
+                    Comment(task_id=rng.choice(tasks), user=rng.choice(users), content=f'Benchmark comment {i}')
+                    for i in range(start, min(start + batch_size, count))
+                )
+        return users
+
+    def cleanup(self):
+        projects = Project.objects.filter(name__startswith=BENCHMARK_PREFIX)
+        # Raw deletes: going through the collector would send a post_delete
+        # signal (search index, tombstones) for every one of the million rows
+        comments = Comment.objects.filter(task__project__in=projects)
+        comments._raw_delete(comments.db)
+        tasks = Task.objects.filter(project__in=projects)
+        tasks._raw_delete(tasks.db)
+        projects.delete()
+        User.objects.filter(username__startswith=BENCHMARK_PREFIX).delete()
+
+    def measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
@@ -3,7 +3,15 @@ from projects.models import Task
 from accounts.models import User
 
 class Comment(models.Model):
-    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='comments')
+    # Indexed through comment_task_created_idx, which leads with task
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='comments', db_index=False)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='comments')
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='comment_created_id_idx'),
+            models.Index(fields=['task', 'created_at', 'id'], name='comment_task_created_idx'),
+        ]
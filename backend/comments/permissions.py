@@ -0,0 +1,32 @@
+from django.db.models import Q
+from core.permissions import AccessPolicy, union_scope
+from projects.models import Task
+from .models import Comment
+
+
+class CommentPolicy(AccessPolicy):
+    model = Comment
+
+    def get_scope(self, user):
+        if user.role in ['admin', 'manager']:
+            return None
+        # Users see comments they wrote or on tasks they are assigned to or own
+        return union_scope(Comment, Q(user=user), Q(task__assigned_to=user), Q(task__project__owner=user))
+
+    def check_loaded(self, user, obj):
+        if obj.user_id == user.id:
+            return True
+        return None
+
+    def event_scope(self, obj):
+        task = Task.objects.filter(pk=obj.task_id).values('assigned_to_id', 'project__owner_id').first() or {}
+        return {
+            'user': obj.user_id,
+            'assigned_to': task.get('assigned_to_id'),
+            'owner': task.get('project__owner_id'),
+        }
+
+    def allows_event(self, user, scope):
+        if user.role in ['admin', 'manager']:
+            return True
+        return user.id in (scope['user'], scope['assigned_to'], scope['owner'])
@@ -2,14 +2,15 @@ from rest_framework import serializers
 from .models import Comment
 from projects.models import Task
 from accounts.models import User
+from core.serializers import SparseFieldsetMixin
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_username = serializers.CharField(source='user.username', read_only=True)
     task_title = serializers.CharField(source='task.title', read_only=True)
     class Meta:
         model = Comment
         fields = [
             'id', 'task', 'task_title', 'user', 'user_username',
-            'content', 'created_at'
+            'content', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at'] 
\ No newline at end of file
+        read_only_fields = ['created_at', 'updated_at'] 
\ No newline at end of file
@@ -1,3 +1,68 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import User
+from core.testing import APITestCase
+from projects.models import Project, Task
+from .models import Comment
+
+
+class CommentConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role='admin')
+        cls.task = Task.objects.create(title='Before', project=Project.objects.create(name='P', owner=cls.admin))
+        cls.comment = Comment.objects.create(task=cls.task, user=cls.admin, content='Hello')
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.admin)
+
+    def test_renaming_the_task_changes_the_validator(self):
+        url = f'/api/comments/comments/{self.comment.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.task.title = 'After'
+        self.task.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['task_title'], 'After')
+
+
+class CommentQueryTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role='admin')
+        cls.developer = User.objects.create_user('dev', password='x', role='developer')
+        project = Project.objects.create(name='P', owner=cls.admin)
+        cls.task = Task.objects.create(title='Discussed', project=project, assigned_to=cls.developer)
+        cls.comments = [
+            Comment.objects.create(task=cls.task, user=user, content=f'Comment {i}')
+            for i, user in enumerate([cls.admin, cls.developer] * 3)
+        ]
+
+    def test_list(self):
+        for user in (self.admin, self.developer):
+            client = self.client_for(user)
+            with self.assertMaxQueries(4):
+                self.assertEqual(client.get('/api/comments/comments/').status_code, 200)
+
+    def test_create(self):
+        client = self.client_for(self.developer)
+        with self.assertMaxQueries(5):
+            response = client.post('/api/comments/comments/', {'task': self.task.pk, 'content': 'New'})
+        self.assertEqual(response.status_code, 201)
+
+    def test_update(self):
+        client = self.client_for(self.developer)
+        url = f'/api/comments/comments/{self.comments[1].pk}/'
+        with self.assertMaxQueries(6):
+            self.assertEqual(client.put(url, {'task': self.task.pk, 'content': 'Edited'}).status_code, 200)
+        with self.assertMaxQueries(5):
+            self.assertEqual(client.patch(url, {'content': 'Edited again'}).status_code, 200)
+
+    def test_destroy(self):
+        client = self.client_for(self.developer)
+        with self.assertMaxQueries(5):
+            response = client.delete(f'/api/comments/comments/{self.comments[1].pk}/')
+        self.assertEqual(response.status_code, 204)
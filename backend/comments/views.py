@@ -1,39 +1,33 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets
+from core.mixins import ConditionalGetMixin, EagerLoadingMixin, QueryBudgetMixin
+from core.pagination import KeysetPagination
+from core.permissions import PolicyPermission
 from .models import Comment
+from .permissions import CommentPolicy
 from .serializers import CommentSerializer
 from projects.models import Task
 from accounts.models import User
-from django.db import models
 
-class IsAdminManagerOrTaskUser(permissions.BasePermission):
-    def has_object_permission(self, request, view, obj):
-        user = request.user
-        if user.role in ['admin', 'manager']:
-            return True
-        # User can access if they are assigned to the task or own the project
-        if obj.user == user:
-            return True
-        if obj.task.assigned_to == user:
-            return True
-        if obj.task.project.owner == user:
-            return True
-        return False
+class TaskCommentPagination(KeysetPagination):
+    """
+    Newest-first pages of one task's comments. Always paginated, since a
+    single task can collect thousands of comments; each page is a range
+    scan on the (task, created_at, id) index.
+    """
 
-class CommentViewSet(viewsets.ModelViewSet):
+    def is_requested(self, request):
+        return True
+
+class CommentViewSet(QueryBudgetMixin, ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all().order_by('-created_at')
     serializer_class = CommentSerializer
-    permission_classes = [permissions.IsAuthenticated, IsAdminManagerOrTaskUser]
+    permission_classes = [PolicyPermission]
+    access_policy = CommentPolicy()
+    # task_title comes from the task row
+    last_modified_related = ['task']
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role in ['admin', 'manager']:
-            return Comment.objects.all()
-        # User can see comments on tasks they are assigned to or own
-        return Comment.objects.filter(
-            models.Q(user=user) |
-            models.Q(task__assigned_to=user) |
-            models.Q(task__project__owner=user)
-        ).distinct()
+        return self.access_policy.filter_queryset(Comment.objects.all(), self.request.user)
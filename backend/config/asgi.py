@@ -9,8 +9,11 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup(set_prefix=False)
 
-application = get_asgi_application()
+from core.asgi import EventStreamASGIHandler  # noqa: E402
+
+application = EventStreamASGIHandler()
@@ -193,8 +193,47 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Opt-in: lists are only paginated when ?cursor= or ?page_size= is sent
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
+# Days deletions are kept for delta sync; older sync positions get 410 Gone
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+# Seconds a sync position stays behind now, so writes that commit late are still picked up
+SYNC_LAG_SECONDS = int(os.getenv('SYNC_LAG_SECONDS', 10))
+
+# Maximum database queries one API request may run before
+# core.mixins.QueryBudgetMixin raises (rolling the request back) or logs a warning
+DEFAULT_QUERY_BUDGET = int(os.getenv('DEFAULT_QUERY_BUDGET', 10))
+QUERY_BUDGET_RAISE = os.getenv('QUERY_BUDGET_RAISE', str(DEBUG)) == 'True'
+# Runs the suite with QUERY_BUDGET_RAISE on
+TEST_RUNNER = 'core.test_runner.QueryBudgetTestRunner'
+
+# Push events (core.events). LocalBackend fans out inside one process; use
+# core.events.RedisBackend when running more than one ASGI worker (the ASGI
+# handler logs a warning at startup when WEB_CONCURRENCY or --workers says so).
+EVENTS_BACKEND = os.getenv('EVENTS_BACKEND', 'core.events.LocalBackend')
+EVENTS_REDIS_URL = os.getenv('EVENTS_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+EVENTS_HEARTBEAT_SECONDS = int(os.getenv('EVENTS_HEARTBEAT_SECONDS', 25))
+EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', 100))
+
+# Chunked uploads (files.uploads): largest part accepted, most parts per upload
+FILE_UPLOAD_MAX_PART_SIZE = int(os.getenv('FILE_UPLOAD_MAX_PART_SIZE', 64 * 1024 * 1024))
+FILE_UPLOAD_MAX_PARTS = int(os.getenv('FILE_UPLOAD_MAX_PARTS', 10000))
+
+# Task file downloads (files.downloads). Empty streams them from Django;
+# 'x-accel-redirect' hands the transfer to nginx (see frontend/nginx.conf),
+# 'x-sendfile' to Apache or lighttpd.
+FILE_DOWNLOAD_OFFLOAD = os.getenv('FILE_DOWNLOAD_OFFLOAD', '')
+FILE_DOWNLOAD_ACCEL_PREFIX = os.getenv('FILE_DOWNLOAD_ACCEL_PREFIX', '/protected-files/')
+
+# Thumbnails and previews of uploaded images and PDFs (files.previews):
+# render processes per web worker (0 disables rendering on upload), and
+# jobs queued before further uploads are left for generate_previews
+FILE_PREVIEW_WORKERS = int(os.getenv('FILE_PREVIEW_WORKERS', 2))
+FILE_PREVIEW_QUEUE_SIZE = int(os.getenv('FILE_PREVIEW_QUEUE_SIZE', 100))
+
 from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),  # Increased for production
@@ -212,6 +251,9 @@ CACHES = {
     }
 }
 
+# Seconds the per-scope dashboard statistics stay cached
+PROJECT_STATS_CACHE_TIMEOUT = int(os.getenv('PROJECT_STATS_CACHE_TIMEOUT', 30))
+
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
@@ -255,6 +297,14 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'if-none-match',
+    'if-modified-since',
+]
+
+# Let browser clients read the conditional GET validators
+CORS_EXPOSE_HEADERS = [
+    'etag',
+    'last-modified',
 ]
 
 # Production logging
@@ -278,4 +328,4 @@ if not DEBUG:
                 'propagate': False,
             },
         },
-    }
\ No newline at end of file
+    }
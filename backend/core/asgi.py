@@ -0,0 +1,42 @@
+from django.core.handlers.asgi import ASGIHandler
+from django.urls import Resolver404, resolve
+
+from . import events
+from .streaming import aiterate
+
+
+class EventStreamASGIHandler(ASGIHandler):
+    """
+    Django's ASGI handler, except that event stream requests skip the
+    per-request ThreadSensitiveContext. That context gives every request its
+    own executor thread for sync code (signal receivers, the token lookup),
+    and the thread lives as long as the response does: one idle thread per
+    open stream. Outside it, their brief sync calls share asgiref's single
+    executor thread instead.
+
+    Sync streaming responses are sent through an async iterator, since
+    Django would otherwise read the whole body into memory first.
+    """
+
+    def __init__(self):
+        super().__init__()
+        events.check_backend()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and self.is_event_stream(scope['path']):
+            await self.handle(scope, receive, send)
+        else:
+            await super().__call__(scope, receive, send)
+
+    async def get_response_async(self, request):
+        response = await super().get_response_async(request)
+        if response.streaming and not response.is_async:
+            # The original iterator's close() stays among the response's closers
+            response.streaming_content = aiterate(response.streaming_content)
+        return response
+
+    def is_event_stream(self, path):
+        try:
+            return resolve(path).url_name == 'events'
+        except Resolver404:
+            return False
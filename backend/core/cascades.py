@@ -0,0 +1,72 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, pre_delete
+
+PENDING_ATTR = '_cascade_pending'
+LAST_ROW_ATTR = '_cascade_last_row'
+
+
+def deleted_with(origin):
+    """The model whose delete() (of an instance or a queryset) started a cascade."""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def reached_origin(instance, origin):
+    """
+    Whether ``instance`` is the row delete() was called on, or the last of
+    a queryset's rows to be signalled. Rows of a model that isn't tracked
+    all count as the last one.
+    """
+    if isinstance(origin, QuerySet):
+        last = origin.__dict__.get(LAST_ROW_ATTR)
+        return isinstance(instance, origin.model) and (last is None or instance is last)
+    return instance is origin
+
+
+def track(*models):
+    """
+    Let defer() hold the items of ``models``' own rows in a queryset delete()
+    until its last row. Call for each sender whose receivers use defer().
+    """
+    for model in models:
+        pre_delete.connect(note_last_row, sender=model, dispatch_uid=f'cascade-last-row-{model._meta.label_lower}')
+
+
+def note_last_row(sender, instance, origin=None, **kwargs):
+    if not isinstance(origin, QuerySet) or not isinstance(instance, origin.model):
+        return
+    # pre_delete goes in ascending pk order and post_delete in descending,
+    # so the first row here is the last one there. One left by an earlier
+    # delete() of the same queryset has had its pk cleared.
+    last = origin.__dict__.get(LAST_ROW_ATTR)
+    if last is None or last.pk is None:
+        origin.__dict__[LAST_ROW_ATTR] = instance
+
+
+def defer(origin, instance, flush, item):
+    """
+    Hand ``item`` to ``flush(items)`` once per cascade rather than once per
+    row. Call from a post_delete receiver with the signal's ``origin``.
+
+    The collector deletes dependents before the rows delete() was called on,
+    so everything a cascade defers is flushed when the origin, or the last
+    row of a queryset origin, is signalled (see track()).
+    """
+    if origin is None:
+        flush([item])
+        return
+    pending = origin.__dict__.setdefault(PENDING_ATTR, {})
+    pending.setdefault(flush, []).append(item)
+    if reached_origin(instance, origin):
+        flush(pending.pop(flush))
+    else:
+        # Connected before the origin's own rows are signalled, and after
+        # every receiver registered at startup
+        model = deleted_with(origin)
+        post_delete.connect(flush_pending, sender=model, dispatch_uid=f'cascade-flush-{model._meta.label_lower}')
+
+
+def flush_pending(sender, instance, origin=None, **kwargs):
+    if origin is None or not reached_origin(instance, origin):
+        return
+    for flush, items in origin.__dict__.pop(PENDING_ATTR, {}).items():
+        flush(items)
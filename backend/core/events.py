@@ -0,0 +1,312 @@
+import asyncio
+import json
+import logging
+import os
+import shlex
+import sys
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EventSource:
+    name: str
+    model: type
+    serializer_class: type
+    policy: object
+
+
+_sources = {}
+
+
+def register(name, model, serializer_class, policy):
+    """
+    Push ``created``/``updated``/``deleted`` events for ``model`` under
+    ``name``. Subscribers only receive events ``policy`` lets them see.
+    """
+    source = EventSource(name, model, serializer_class, policy)
+    _sources[name] = source
+    pre_save.connect(_remember_scope, sender=model, dispatch_uid=f'events-scope-{name}')
+    post_save.connect(_on_save, sender=model, dispatch_uid=f'events-save-{name}')
+    post_delete.connect(_on_delete, sender=model, dispatch_uid=f'events-delete-{name}')
+    return source
+
+
+def get_sources():
+    return dict(_sources)
+
+
+def _source_for_model(model):
+    for source in _sources.values():
+        if source.model is model:
+            return source
+    return None
+
+
+def _remember_scope(sender, instance, raw=False, **kwargs):
+    # Captured before post_save handlers refresh the loaded snapshot
+    source = _source_for_model(sender)
+    instance._previous_event_scope = source.policy.previous_event_scope(instance)
+
+
+def _on_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        publish_objects(sender, 'created' if created else 'updated', [instance])
+
+
+def _on_delete(sender, instance, origin=None, **kwargs):
+    # Cascades and queryset deletes publish nothing per row: the parent's
+    # own event covers a cascade, and bulk writers call publish_objects
+    if origin is instance:
+        publish_objects(sender, 'deleted', [instance])
+
+
+def build_event(source, action, obj, previous_scope=None):
+    event = {
+        'model': source.name,
+        'action': action,
+        'id': obj.pk,
+        'scope': source.policy.event_scope(obj),
+        'previous_scope': previous_scope,
+        'data': None,
+    }
+    if action != 'deleted':
+        event['data'] = source.serializer_class(obj).data
+    return event
+
+
+def publish_objects(model, action, objs):
+    """
+    Publish events for ``objs`` once the surrounding transaction commits,
+    so subscribers never hear about rolled back writes.
+
+    Nothing is done while the backend has no subscribers, which covers
+    management commands and the admin. Otherwise payloads are serialized
+    at commit time, outside the write; only a deletion's scope is read
+    now, while the rows it depends on are still there.
+    """
+    source = _source_for_model(model)
+    objs = list(objs)
+    if source is None or not objs or not get_backend().has_subscribers():
+        return
+    # Read from loaded columns now: a later save in this transaction replaces them
+    previous_scopes = [
+        getattr(obj, '_previous_event_scope', None) or source.policy.previous_event_scope(obj) for obj in objs
+    ]
+    if action == 'deleted':
+        events = [build_event(source, action, obj, previous) for obj, previous in zip(objs, previous_scopes)]
+        transaction.on_commit(lambda: publish(events))
+    else:
+        transaction.on_commit(lambda: publish(
+            build_event(source, action, obj, previous) for obj, previous in zip(objs, previous_scopes)
+        ))
+
+
+def publish(events):
+    backend = get_backend()
+    if not backend.has_subscribers():
+        return
+    for event in events:
+        backend.publish(event)
+
+
+class Subscription:
+    """One connected client: who it is, which models it wants and its pending messages."""
+
+    def __init__(self, user, models, queue_size):
+        self.user = user
+        self.models = models
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client this far behind is better off reconnecting and
+            # catching up with delta sync than holding events in memory
+            self.close()
+
+    def close(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+@dataclass
+class Broker:
+    """
+    In-process fan-out from published events to this worker's subscribers.
+
+    Everything here runs on the event loop; ``deliver_threadsafe`` is the
+    entry point for sync code (views run in a thread under ASGI).
+    """
+    subscriptions: set = field(default_factory=set)
+    loop: asyncio.AbstractEventLoop = None
+    started: bool = False
+
+    async def subscribe(self, user, models):
+        self.loop = asyncio.get_running_loop()
+        if not self.started:
+            self.started = True
+            self.heartbeat_task = asyncio.create_task(self.heartbeat(settings.EVENTS_HEARTBEAT_SECONDS))
+            await get_backend().start(self)
+        subscription = Subscription(user, models, settings.EVENTS_QUEUE_SIZE)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+    def deliver(self, event):
+        source = _sources.get(event['model'])
+        if source is None:
+            return
+        # Formatted once here rather than once per subscriber
+        full = format_event({key: event[key] for key in ('model', 'action', 'id', 'data')})
+        removed = format_event({'model': event['model'], 'action': 'removed', 'id': event['id'], 'data': None})
+        for subscription in list(self.subscriptions):
+            if event['model'] not in subscription.models:
+                continue
+            user = subscription.user
+            if source.policy.allows_event(user, event['scope']):
+                subscription.offer(full)
+            elif event['previous_scope'] and source.policy.allows_event(user, event['previous_scope']):
+                # The write took the row out of this user's view
+                subscription.offer(removed)
+
+    async def heartbeat(self, interval):
+        # One timer for every subscriber rather than a timeout per stream
+        while True:
+            await asyncio.sleep(interval)
+            for subscription in list(self.subscriptions):
+                subscription.offer(HEARTBEAT)
+
+    def deliver_threadsafe(self, event):
+        if self.loop is None or self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.deliver, event)
+
+
+# Comment line: keeps proxies from closing an idle connection
+HEARTBEAT = ': ping\n\n'
+
+broker = Broker()
+
+
+class LocalBackend:
+    """Deliver events to this process's broker only; enough for a single worker."""
+
+    def has_subscribers(self):
+        return bool(broker.subscriptions)
+
+    def publish(self, event):
+        broker.deliver_threadsafe(event)
+
+    async def start(self, broker):
+        pass
+
+
+class RedisBackend:
+    """
+    Fan events out through Redis pub/sub so every worker's broker sees every
+    event, whichever process handled the write.
+    """
+    channel = 'events'
+    # Seconds a subscriber count from Redis is reused before asking again
+    subscriber_check_seconds = 1
+
+    def __init__(self):
+        import redis
+        self.url = settings.EVENTS_REDIS_URL
+        self.client = redis.Redis.from_url(self.url)
+        self.subscribed = False
+        self.subscribers_checked_at = None
+
+    def has_subscribers(self):
+        # Counts workers listening on the channel, which each start doing
+        # with their first stream
+        now = time.monotonic()
+        if self.subscribers_checked_at is None or now - self.subscribers_checked_at >= self.subscriber_check_seconds:
+            [(_, count)] = self.client.pubsub_numsub(self.channel)
+            self.subscribed, self.subscribers_checked_at = count > 0, now
+        return self.subscribed
+
+    def publish(self, event):
+        self.client.publish(self.channel, json.dumps(event, cls=DjangoJSONEncoder))
+
+    async def start(self, broker):
+        import redis.asyncio
+        pubsub = redis.asyncio.Redis.from_url(self.url).pubsub()
+        await pubsub.subscribe(self.channel)
+        self.listener = asyncio.create_task(self.listen(pubsub, broker))
+
+    async def listen(self, pubsub, broker):
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        broker.deliver(json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Event listener lost its Redis connection; retrying')
+                await asyncio.sleep(1)
+                await pubsub.subscribe(self.channel)
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(settings.EVENTS_BACKEND)()
+    return _backend
+
+
+def configured_workers(argv=None, environ=None):
+    """
+    The number of worker processes the server was started with: ``-w`` or
+    ``--workers`` on the command line or in GUNICORN_CMD_ARGS, else
+    WEB_CONCURRENCY, else 1.
+    """
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    workers = environ.get('WEB_CONCURRENCY')
+    args = shlex.split(environ.get('GUNICORN_CMD_ARGS', '')) + list(argv[1:])
+    for index, arg in enumerate(args):
+        if arg in ('-w', '--workers') and index + 1 < len(args):
+            workers = args[index + 1]
+        elif arg.startswith('--workers='):
+            workers = arg.split('=', 1)[1]
+        elif arg.startswith('-w') and arg[2:].isdigit():
+            workers = arg[2:]
+    try:
+        return max(int(workers), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def check_backend():
+    """Warn when LocalBackend runs in more than one worker, where most subscribers never see an event."""
+    workers = configured_workers()
+    if workers > 1 and issubclass(import_string(settings.EVENTS_BACKEND), LocalBackend):
+        logger.warning(
+            'EVENTS_BACKEND is %s but the server runs %d workers: events only reach streams '
+            'connected to the worker that handled the write. Use core.events.RedisBackend.',
+            settings.EVENTS_BACKEND, workers,
+        )
+
+
+def format_event(event):
+    """Serialize an event as one Server-Sent Events message."""
+    data = json.dumps(event, cls=DjangoJSONEncoder)
+    return f"event: {event['model']}.{event['action']}\ndata: {data}\n\n"
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import resource
+import statistics
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from projects.models import Project
+
+LOADTEST_USER = '__events_loadtest__'
+
+
+class Command(BaseCommand):
+    help = 'Hold many idle /api/events/ connections against a running ASGI server and time event fan-out'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the running ASGI server')
+        parser.add_argument('--connections', type=int, default=5000, help='Idle connections to open')
+        parser.add_argument('--idle', type=float, default=30, help='Seconds to hold the connections idle')
+        parser.add_argument('--events', type=int, default=5, help='Tasks to create while connected')
+        parser.add_argument('--ramp', type=int, default=250, help='Connections opened concurrently')
+        parser.add_argument('--pid', type=int, help='Server worker pid, to report its resident memory')
+        parser.add_argument('--keep', action='store_true', help='Keep the load test user and project')
+
+    def handle(self, *args, **options):
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        needed = options['connections'] + 100
+        if soft < needed:
+            if hard != resource.RLIM_INFINITY and hard < needed:
+                raise CommandError(f'Open file limit is {hard}; {needed} descriptors are needed')
+            resource.setrlimit(resource.RLIMIT_NOFILE, (needed, hard))
+
+        user, _ = User.objects.get_or_create(username=LOADTEST_USER, defaults={'role': 'admin'})
+        project, _ = Project.objects.get_or_create(name=LOADTEST_USER, defaults={'owner': user})
+        token = str(RefreshToken.for_user(user).access_token)
+        try:
+            asyncio.run(self.run(options, token, project))
+        finally:
+            if not options['keep']:
+                project.delete()
+                user.delete()
+
+    async def run(self, options, token, project):
+        url = urlsplit(options['url'])
+        host, port = url.hostname, url.port or 80
+        rss_before = self.rss(options['pid'])
+
+        started = time.perf_counter()
+        connections, failures = [], 0
+        total = options['connections']
+        for start in range(0, total, options['ramp']):
+            batch = min(options['ramp'], total - start)
+            results = await asyncio.gather(
+                *(self.connect(host, port, token) for _ in range(batch)), return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    failures += 1
+                else:
+                    connections.append(result)
+        connect_s = time.perf_counter() - started
+        self.stdout.write(
+            f'Opened {len(connections)} connections in {connect_s:.1f}s ({failures} failed); '
+            f'holding them idle for {options["idle"]:.0f}s'
+        )
+
+        await asyncio.sleep(options['idle'])
+        alive = [conn for conn in connections if not conn[0].at_eof()]
+        rss_idle = self.rss(options['pid'])
+        self.stdout.write(f'{len(alive)} of {len(connections)} still open after idling')
+        if rss_before and rss_idle:
+            per_connection = (rss_idle - rss_before) / max(len(alive), 1)
+            self.stdout.write(
+                f'Server RSS {rss_before / 1024:.0f} MiB -> {rss_idle / 1024:.0f} MiB '
+                f'({per_connection:.1f} KiB per connection)'
+            )
+
+        latencies = []
+        for index in range(options['events']):
+            readers = [asyncio.create_task(self.wait_for_event(reader)) for reader, _ in alive]
+            sent = time.perf_counter()
+            await asyncio.to_thread(self.create_task, options['url'], token, project, index)
+            write_ms = (time.perf_counter() - sent) * 1000
+            arrivals = await asyncio.gather(*readers, return_exceptions=True)
+            received = [arrival - sent for arrival in arrivals if isinstance(arrival, float)]
+            latencies.extend(received)
+            self.stdout.write(
+                f'Event {index + 1}: write took {write_ms:.1f} ms, delivered to {len(received)}/{len(alive)} connections, '
+                f'p50 {self.percentile(received, 50):.1f} ms, p99 {self.percentile(received, 99):.1f} ms, '
+                f'max {max(received, default=0) * 1000:.1f} ms'
+            )
+
+        if latencies:
+            self.stdout.write(self.style.SUCCESS(
+                f'Fan-out over {options["events"]} events: p50 {self.percentile(latencies, 50):.1f} ms, '
+                f'p99 {self.percentile(latencies, 99):.1f} ms'
+            ))
+        for _, writer in connections:
+            writer.close()
+
+    async def connect(self, host, port, token):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write((
+            f'GET /api/events/?token={token}&models=task HTTP/1.1\r\n'
+            f'Host: {host}\r\nAccept: text/event-stream\r\n\r\n'
+        ).encode())
+        await writer.drain()
+        status = await reader.readline()
+        if b' 200 ' not in status:
+            writer.close()
+            raise ConnectionError(status.decode(errors='replace').strip())
+        while (await reader.readline()) not in (b'\r\n', b''):
+            pass
+        return reader, writer
+
+    async def wait_for_event(self, reader, timeout=30):
+        deadline = time.perf_counter() + timeout
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout=max(deadline - time.perf_counter(), 0.01))
+            if not line:
+                raise ConnectionError('closed')
+            if b'event: task.created' in line:
+                return time.perf_counter()
+
+    def create_task(self, base_url, token, project, index):
+        request = urllib.request.Request(
+            f'{base_url}/api/projects/tasks/',
+            data=json.dumps({'title': f'Load test event {index}', 'project': project.pk, 'status': 'todo'}).encode(),
+            headers={'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'},
+            method='POST',
+        )
+        with urllib.request.urlopen(request) as response:
+            response.read()
+
+    def percentile(self, values, percentile):
+        if not values:
+            return 0
+        if len(values) == 1:
+            return values[0] * 1000
+        return statistics.quantiles(values, n=100)[percentile - 1] * 1000
+
+    def rss(self, pid):
+        """Resident memory of ``pid`` in KiB, read from /proc."""
+        if not pid:
+            return None
+        try:
+            with open(f'/proc/{pid}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1])
+        except OSError:
+            return None
+        return None
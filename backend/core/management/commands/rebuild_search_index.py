@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import search
+from core.models import SearchEntry
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index from the registered models'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows indexed per upsert')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for name, search_type in search.get_types().items():
+            columns = ['pk', search_type.title, search_type.body]
+            queryset = search_type.model.objects.only(*columns).order_by('pk')
+            with transaction.atomic():
+                SearchEntry.objects.filter(model=search_type.label).delete()
+                count, last_pk = 0, None
+                while True:
+                    batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+                    batch = list(batch[:batch_size])
+                    if not batch:
+                        break
+                    search.index_objects(search_type.model, batch, batch_size=batch_size)
+                    count += len(batch)
+                    last_pk = batch[-1].pk
+            self.stdout.write(f'Indexed {count} {name} rows')
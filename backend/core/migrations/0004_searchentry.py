@@ -0,0 +1,87 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:49
+
+from django.db import migrations, models
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_searchentry_fts USING fts5(
+        title, body, content='core_searchentry', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER core_searchentry_ai AFTER INSERT ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchentry_ad AFTER DELETE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchentry_au AFTER UPDATE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO core_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS core_searchentry_au',
+    'DROP TRIGGER IF EXISTS core_searchentry_ad',
+    'DROP TRIGGER IF EXISTS core_searchentry_ai',
+    'DROP TABLE IF EXISTS core_searchentry_fts',
+]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE core_searchentry ADD COLUMN document tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX core_searchentry_document_idx ON core_searchentry USING GIN (document)',
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS core_searchentry_document_idx',
+    'ALTER TABLE core_searchentry DROP COLUMN IF EXISTS document',
+]
+
+
+def run_statements(forward):
+    def run(apps, schema_editor):
+        statements = {
+            'sqlite': SQLITE_FORWARD if forward else SQLITE_REVERSE,
+            'postgresql': POSTGRES_FORWARD if forward else POSTGRES_REVERSE,
+        }.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+            ],
+            options={
+                'unique_together': {('model', 'object_id')},
+            },
+        ),
+        migrations.RunPython(run_statements(forward=True), run_statements(forward=False)),
+    ]
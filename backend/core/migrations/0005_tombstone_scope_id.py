@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_searchentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='scope_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def clear_comment_titles(apps, schema_editor):
+    # Comments were indexed with their content as the title as well as the body
+    SearchEntry = apps.get_model('core', 'SearchEntry')
+    SearchEntry.objects.filter(model='comments.comment').exclude(title='').update(title='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_tombstone_scope_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_comment_titles, migrations.RunPython.noop),
+    ]
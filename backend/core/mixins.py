@@ -0,0 +1,401 @@
+import base64
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import serializers, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from .models import Tombstone
+
+logger = logging.getLogger(__name__)
+
+_eager_loading_plans = {}
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def get_eager_loading_plan(serializer):
+    """
+    Derive (select_related, prefetch_related, only) for a ModelSerializer.
+
+    Dotted ``source=`` paths such as ``assigned_to.username`` and nested
+    serializers such as ``TaskSerializer(many=True)`` are mapped onto the
+    model's relations. Single-valued chains become ``select_related``
+    joins; anything reached through a reverse or many-to-many relation is
+    prefetched. ``only`` lists the columns the serializer reads, or is
+    None when a field's source can't be resolved to model columns.
+    """
+    if isinstance(serializer, type):
+        serializer = serializer()
+    key = (type(serializer), _field_signature(serializer))
+    if key not in _eager_loading_plans:
+        model = serializer.Meta.model
+        select_related, prefetch_related = set(), set()
+        _collect_relations(serializer, model, '', False, select_related, prefetch_related)
+        _eager_loading_plans[key] = (
+            sorted(select_related), sorted(prefetch_related), _collect_columns(serializer, model),
+        )
+    return _eager_loading_plans[key]
+
+
+def apply_eager_loading(queryset, serializer, extra_columns=()):
+    """
+    Apply ``serializer``'s eager loading plan to ``queryset``. When the
+    serializer was trimmed with ``?fields=``/``?omit=`` the unused columns
+    are left out of the SELECT as well.
+    """
+    select_related, prefetch_related, only = get_eager_loading_plan(serializer)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    if only is not None and getattr(serializer, 'is_sparse', False):
+        queryset = queryset.only(*only, *[column for column in extra_columns if column])
+    return queryset
+
+
+def _field_signature(serializer):
+    signature = []
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        nested = _field_signature(field) if isinstance(field, serializers.BaseSerializer) else None
+        signature.append((name, nested))
+    return tuple(signature)
+
+
+def _collect_relations(serializer, model, prefix, many, select_related, prefetch_related):
+    for field in serializer.fields.values():
+        if field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+            continue
+
+        nested = None
+        if isinstance(field, serializers.ListSerializer):
+            nested = field.child
+            path = field.source.split('.')
+        elif isinstance(field, serializers.BaseSerializer):
+            nested = field
+            path = field.source.split('.')
+        else:
+            # The last attribute is a value on the final related object
+            path = field.source.split('.')[:-1]
+
+        current_model, lookup, is_many = model, prefix, many
+        for attr in path:
+            try:
+                model_field = current_model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation:
+                break
+            lookup = f'{lookup}__{attr}' if lookup else attr
+            is_many = is_many or model_field.many_to_many or model_field.one_to_many
+            (prefetch_related if is_many else select_related).add(lookup)
+            current_model = model_field.related_model
+        else:
+            if nested is not None and lookup != prefix:
+                _collect_relations(
+                    nested, current_model, lookup, is_many,
+                    select_related, prefetch_related,
+                )
+
+
+def _collect_columns(serializer, model):
+    columns = {model._meta.pk.name}
+    for field in serializer.fields.values():
+        if isinstance(field, serializers.SerializerMethodField):
+            continue
+        if field.source == '*':
+            return None
+
+        current_model, lookup = model, ''
+        parts = field.source.split('.')
+        for index, attr in enumerate(parts):
+            try:
+                model_field = current_model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                if index == 0:
+                    # A property or method; there's no telling which columns it reads
+                    return None
+                break
+            if not model_field.concrete:
+                # Reverse relations are prefetched and need no local column
+                break
+            lookup = f'{lookup}__{attr}' if lookup else attr
+            columns.add(lookup)
+            if not model_field.is_relation or isinstance(field, serializers.BaseSerializer):
+                break
+            current_model = model_field.related_model
+    return sorted(columns)
+
+
+class EagerLoadingMixin:
+    """
+    Apply the serializer's eager loading plan to the viewset queryset so
+    related names and nested objects never cost one query per row.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        ordering_field = getattr(self.paginator, 'ordering_field', None)
+        return apply_eager_loading(queryset, self.get_serializer(), extra_columns=[ordering_field])
+
+
+class DeltaSyncMixin:
+    """
+    Incremental list sync with ``?since=<ISO timestamp>`` or ``?sync_token=``.
+
+    Returns the rows changed since that point, oldest first, keyset
+    paginated on (sync_field, id), and the ids recorded as Tombstones. Send
+    the returned ``sync_token`` on the next request. Clients should apply
+    ``deleted`` before ``changed``, because a row that moved between users
+    shows up in both lists. Tombstones are paged like rows and limited by
+    the view's ``access_policy``; writes from the last SYNC_LAG_SECONDS
+    may be sent again. Tokens older than
+    ``SYNC_TOMBSTONE_RETENTION_DAYS`` get 410 Gone, since tombstones they
+    still need may have been pruned.
+    """
+    sync_field = 'updated_at'
+    sync_page_size = 500
+
+    def list(self, request, *args, **kwargs):
+        if 'since' not in request.query_params and 'sync_token' not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        return self.sync(request)
+
+    def sync(self, request):
+        now = timezone.now()
+        queryset = self.filter_queryset(self.get_queryset())
+        label = queryset.model._meta.label_lower
+        watermark, last_id, tombstone_id, issued = self.decode_sync_position(request, label)
+
+        if issued < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+            return Response(
+                {'detail': 'Sync position is older than the tombstone retention window; fetch the full list again.'},
+                status=status.HTTP_410_GONE
+            )
+
+        field = self.sync_field
+        rows = list(queryset.filter(
+            Q(**{f'{field}__gt': watermark}) | Q(**{field: watermark, 'id__gt': last_id})
+        ).order_by(field, 'id')[:self.sync_page_size + 1])
+        rows_have_more = len(rows) > self.sync_page_size
+        rows = rows[:self.sync_page_size]
+
+        tombstones = Tombstone.objects.filter(model=label, id__gt=tombstone_id)
+        policy = getattr(self, 'access_policy', None)
+        scope = policy.get_tombstone_scope(request.user) if policy else None
+        if scope is not None:
+            tombstones = tombstones.filter(scope)
+        tombstones = list(
+            tombstones.order_by('id').values_list('id', 'object_id', 'deleted_at')[:self.sync_page_size + 1]
+        )
+        tombstones_have_more = len(tombstones) > self.sync_page_size
+        tombstones = tombstones[:self.sync_page_size]
+
+        # updated_at and tombstone ids are taken before commit, so a write
+        # still committing can land behind a position already handed out.
+        # On the last page the position stops SYNC_LAG_SECONDS short of now
+        # and the next sync reads the most recent writes again.
+        horizon = now - timedelta(seconds=settings.SYNC_LAG_SECONDS)
+        if rows:
+            watermark, last_id = getattr(rows[-1], field), rows[-1].pk
+        if not rows_have_more and watermark > horizon:
+            watermark, last_id = horizon, 0
+        for position, _, deleted_at in tombstones:
+            if deleted_at > horizon and not tombstones_have_more:
+                break
+            tombstone_id = position
+
+        return Response({
+            'changed': self.get_serializer(rows, many=True).data,
+            'deleted': sorted({object_id for _, object_id, _ in tombstones}),
+            'has_more': rows_have_more or tombstones_have_more,
+            'sync_token': self.encode_sync_token(watermark, last_id, tombstone_id, now),
+        })
+
+    def decode_sync_position(self, request, label):
+        """Return (watermark, last_id, tombstone_id, issued) for the request."""
+        token = request.query_params.get('sync_token')
+        if token:
+            try:
+                payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+                return (
+                    datetime.fromisoformat(payload['t']), int(payload['i']),
+                    int(payload['d']), datetime.fromisoformat(payload['at']),
+                )
+            except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+                raise ValidationError({'sync_token': 'Invalid sync token.'})
+
+        try:
+            since = parse_datetime(request.query_params.get('since', ''))
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValidationError({'since': 'Expected an ISO 8601 timestamp.'})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        tombstone_id = Tombstone.objects.filter(
+            model=label, deleted_at__lte=since,
+        ).aggregate(last=Max('id'))['last'] or 0
+        return since, 0, tombstone_id, since
+
+    def encode_sync_token(self, watermark, last_id, tombstone_id, issued):
+        payload = json.dumps({
+            't': watermark.isoformat(), 'i': last_id, 'd': tombstone_id, 'at': issued.isoformat(),
+        })
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+class ConditionalGetMixin:
+    """
+    Answer list and retrieve requests with 304 Not Modified when nothing the
+    user can see has changed.
+
+    The validator is ``MAX(last_modified_field)`` and ``COUNT(*)`` over the
+    same filtered queryset the action would serialize, so an unchanged view
+    costs one aggregate query and no serialization. Lists are only matched
+    on ``If-None-Match``: a deletion lowers the count but not the maximum,
+    so ``If-Modified-Since`` alone could miss it.
+
+    ``last_modified_related`` names the forward relations whose own
+    ``last_modified_field`` feeds the validator too, for serializers that
+    show a related row's values (``task_title``, say). Usernames are left
+    out: User keeps no modification time, so a rename stays behind a 304
+    until the row itself changes.
+    """
+    last_modified_field = 'updated_at'
+    last_modified_related = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(request, queryset, detail=False) or \
+            self.with_validators(super().list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+            conditional = self.conditional_response(request, queryset, detail=True)
+        except (TypeError, ValueError, DjangoValidationError):
+            # A malformed id matches nothing; retrieve answers with its 404
+            return super().retrieve(request, *args, **kwargs)
+        return conditional or self.with_validators(super().retrieve(request, *args, **kwargs))
+
+    def get_validator(self, queryset):
+        """Return (last_modified, count) for ``queryset``."""
+        field = self.last_modified_field
+        related = {
+            f'related_{index}': Max(f'{relation}__{field}')
+            for index, relation in enumerate(self.last_modified_related)
+        }
+        result = queryset.order_by().aggregate(last_modified=Max(field), count=Count('pk'), **related)
+        values = [result['last_modified'], *(result[name] for name in related)]
+        return max(filter(None, values), default=None), result['count']
+
+    def conditional_response(self, request, queryset, detail):
+        last_modified, count = self.get_validator(queryset)
+        digest = hashlib.sha1(
+            f'{request.user.pk}|{request.get_full_path()}|{request.accepted_media_type}|'
+            f'{last_modified.isoformat() if last_modified else ""}|{count}'.encode()
+        ).hexdigest()
+        self.conditional_etag = f'W/{quote_etag(digest)}'
+        self.conditional_last_modified = last_modified
+
+        if detail and not count:
+            # Let retrieve produce its normal 404
+            return None
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            etags = [etag.removeprefix('W/') for etag in parse_etags(if_none_match)]
+            if '*' in etags or quote_etag(digest) in etags:
+                return self.with_validators(Response(status=status.HTTP_304_NOT_MODIFIED))
+            return None
+
+        if detail and last_modified:
+            if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+            if if_modified_since is not None and int(last_modified.timestamp()) <= if_modified_since:
+                return self.with_validators(Response(status=status.HTTP_304_NOT_MODIFIED))
+        return None
+
+    def with_validators(self, response):
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = self.conditional_etag
+            if self.conditional_last_modified:
+                response['Last-Modified'] = http_date(self.conditional_last_modified.timestamp())
+            patch_vary_headers(response, ['Authorization'])
+        return response
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMixin:
+    """
+    Cap the number of database queries a single request may run.
+
+    ``query_budget`` is either an int or a dict keyed by action name;
+    anything not configured falls back to ``settings.DEFAULT_QUERY_BUDGET``.
+    With ``QUERY_BUDGET_RAISE`` (on in DEBUG, and in the test suite) the
+    request runs in one transaction and exceeding the budget raises inside
+    it, so the request's writes are rolled back rather than committed
+    behind an error. Otherwise a warning is logged.
+    """
+    query_budget = None
+
+    def get_query_budget(self):
+        budget = self.query_budget
+        if isinstance(budget, dict):
+            budget = budget.get(getattr(self, 'action', None))
+        if budget is None:
+            budget = settings.DEFAULT_QUERY_BUDGET
+        return budget
+
+    def dispatch(self, request, *args, **kwargs):
+        if not settings.QUERY_BUDGET_RAISE:
+            response, message = self.dispatch_counted(request, *args, **kwargs)
+            if message:
+                logger.warning(message)
+            return response
+
+        with transaction.atomic():
+            response, message = self.dispatch_counted(request, *args, **kwargs)
+            if message:
+                raise QueryBudgetExceeded(message)
+        return response
+
+    def dispatch_counted(self, request, *args, **kwargs):
+        """Return the response and, if it went over budget, a message saying so."""
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+
+        budget = self.get_query_budget()
+        if budget is None or counter.count <= budget:
+            return response, None
+        return response, (
+            f'{self.__class__.__name__}.{getattr(self, "action", None)} ran '
+            f'{counter.count} queries, over its budget of {budget} '
+            f'({request.method} {request.path})'
+        )
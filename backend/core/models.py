@@ -13,4 +13,55 @@ class AuditLog(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.user} - {self.action} - {self.created_at}"
\ No newline at end of file
+        return f"{self.user} - {self.action} - {self.created_at}"
+
+class Tombstone(models.Model):
+    """
+    Marks a row that was deleted, or moved out of some users' view, so delta
+    sync clients know to drop it. Only the id is kept; clients that can
+    still see the row receive it again in the same sync as a change.
+    ``scope_id`` is the user the row's scope column pointed at (its owner or
+    assignee), so each user is only sent the tombstones of rows they could
+    have seen.
+    """
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    scope_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'id'], name='tombstone_model_id_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} - {self.deleted_at}"
+
+    @classmethod
+    def record(cls, rows):
+        """Insert one tombstone per (model, object_id, scope_id) in ``rows``, in one query."""
+        cls.objects.bulk_create([
+            cls(model=model._meta.label_lower, object_id=object_id, scope_id=scope_id)
+            for model, object_id, scope_id in rows
+        ])
+
+
+class SearchEntry(models.Model):
+    """
+    Searchable text for one row of a model registered with core.search.
+
+    The full-text index lives alongside this table and is kept in sync by the
+    database itself: FTS5 triggers on SQLite, a generated tsvector column
+    with a GIN index on PostgreSQL (see migration 0004_searchentry).
+    """
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    title = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        unique_together = ['model', 'object_id']
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
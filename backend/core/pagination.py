@@ -0,0 +1,134 @@
+import base64
+import json
+from datetime import datetime
+from urllib.parse import urlencode, urlparse, urlunparse, parse_qsl
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset pagination ordered newest first on (ordering_field, id).
+
+    Pagination only kicks in when the request carries ``cursor`` or
+    ``page_size``, so clients that expect a plain list keep getting one.
+    Each page is a range scan on the composite (ordering_field, id) index,
+    so fetching page N costs the same as fetching page 1.
+    """
+    ordering_field = 'created_at'
+    page_size = api_settings.PAGE_SIZE or 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_requested(self, request):
+        return (
+            self.cursor_query_param in request.query_params or
+            self.page_size_query_param in request.query_params
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        field = self.ordering_field
+
+        if cursor is None:
+            reverse = False
+            queryset = queryset.order_by(f'-{field}', '-id')
+        else:
+            reverse, value, pk = cursor
+            if reverse:
+                # Walking back towards newer rows
+                queryset = queryset.filter(
+                    Q(**{f'{field}__gte': value}) &
+                    (Q(**{f'{field}__gt': value}) | Q(id__gt=pk))
+                ).order_by(field, 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__lte': value}) &
+                    (Q(**{f'{field}__lt': value}) | Q(id__lt=pk))
+                ).order_by(f'-{field}', '-id')
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def make_cursor(self, obj, reverse=False):
+        value = getattr(obj, self.ordering_field)
+        payload = json.dumps({'r': int(reverse), 'v': value.isoformat(), 'i': obj.pk})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def encode_cursor(self, obj, reverse):
+        token = self.make_cursor(obj, reverse)
+        scheme, netloc, path, params, query, fragment = urlparse(self.base_url)
+        query_params = dict(parse_qsl(query, keep_blank_values=True))
+        query_params[self.cursor_query_param] = token
+        query_params[self.page_size_query_param] = self.page_size
+        return urlunparse((scheme, netloc, path, params, urlencode(query_params), fragment))
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            return bool(payload['r']), datetime.fromisoformat(payload['v']), int(payload['i'])
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
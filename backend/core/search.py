@@ -0,0 +1,254 @@
+import re
+from dataclasses import dataclass
+
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+
+from . import cascades
+from .models import SearchEntry
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+
+
+@dataclass
+class SearchType:
+    name: str
+    model: type
+    title: str | None
+    body: str
+    policy: object
+
+    @property
+    def label(self):
+        return self.model._meta.label_lower
+
+    def entry_for(self, obj):
+        return SearchEntry(
+            model=self.label,
+            object_id=obj.pk,
+            title=(getattr(obj, self.title) or '') if self.title else '',
+            body=getattr(obj, self.body) or '',
+        )
+
+
+_registry = {}
+
+
+def register(name, model, title, body, policy):
+    """
+    Index ``title`` and ``body`` of ``model`` under the search type ``name``.
+    ``title`` may be None for models that only have a body.
+
+    Hits are filtered through ``policy`` (an AccessPolicy), so search shows
+    exactly what the model's own endpoints would.
+    """
+    search_type = SearchType(name, model, title, body, policy)
+    _registry[name] = search_type
+    post_save.connect(_on_save, sender=model, dispatch_uid=f'search-index-{name}')
+    post_delete.connect(_on_delete, sender=model, dispatch_uid=f'search-remove-{name}')
+    cascades.track(model)
+    return search_type
+
+
+def get_types():
+    return dict(_registry)
+
+
+def _type_for_model(model):
+    for search_type in _registry.values():
+        if search_type.model is model:
+            return search_type
+    return None
+
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_objects(sender, [instance])
+
+
+def _on_delete(sender, instance, origin=None, **kwargs):
+    # Entries of rows removed in one cascade go in one DELETE
+    cascades.defer(origin, instance, remove_rows, (sender, instance.pk))
+
+
+def index_objects(model, objs, batch_size=1000):
+    """Insert or refresh the search entries for ``objs`` in one upsert per batch."""
+    search_type = _type_for_model(model)
+    if search_type is None:
+        return
+    entries = [search_type.entry_for(obj) for obj in objs]
+    if entries:
+        SearchEntry.objects.bulk_create(
+            entries,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['model', 'object_id'],
+            update_fields=['title', 'body'],
+        )
+
+
+def remove_objects(model, object_ids):
+    remove_rows((model, object_id) for object_id in object_ids)
+
+
+def remove_rows(rows):
+    """Delete the entries of (model, object_id) ``rows``, of any models, in one query."""
+    ids_by_label = {}
+    for model, object_id in rows:
+        ids_by_label.setdefault(model._meta.label_lower, []).append(object_id)
+    if ids_by_label:
+        SearchEntry.objects.filter(reduce(or_, (
+            Q(model=label, object_id__in=ids) for label, ids in ids_by_label.items()
+        ))).delete()
+
+
+def build_match_query(query):
+    """
+    Turn free text into an FTS5 MATCH expression: every word must match,
+    and the last one also matches as a prefix so results follow typing.
+    """
+    terms = TERM_RE.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _sqlite_ranked(query, scopes, limit, offset):
+    match = build_match_query(query)
+    if match is None:
+        return 0, []
+    where, params = _scope_sql(scopes)
+    source = f"""
+        FROM core_searchentry_fts
+        JOIN core_searchentry e ON e.id = core_searchentry_fts.rowid
+        WHERE core_searchentry_fts MATCH %s AND ({where})
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) {source}', [match, *params])
+        count = cursor.fetchone()[0]
+        cursor.execute(f"""
+            SELECT e.id, e.model, e.object_id, bm25(core_searchentry_fts, 10.0, 1.0) AS rank
+            {source}
+            ORDER BY rank, e.id
+            LIMIT %s OFFSET %s
+        """, [match, *params, limit, offset])
+        # bm25() is lower-is-better; flip it so every backend ranks higher-is-better
+        return count, [(entry_id, label, object_id, -rank) for entry_id, label, object_id, rank in cursor.fetchall()]
+
+
+def _sqlite_snippets(query, entry_ids):
+    match = build_match_query(query)
+    placeholders = ', '.join(['%s'] * len(entry_ids))
+    sql = f"""
+        SELECT rowid, title,
+               snippet(core_searchentry_fts, 1, %s, %s, '…', 16)
+        FROM core_searchentry_fts
+        WHERE core_searchentry_fts MATCH %s AND rowid IN ({placeholders})
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [HIGHLIGHT_START, HIGHLIGHT_STOP, match, *entry_ids])
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+
+def _postgres_ranked(query, scopes, limit, offset):
+    where, params = _scope_sql(scopes)
+    source = f"""
+        FROM core_searchentry e
+        WHERE e.document @@ websearch_to_tsquery('english', %s) AND ({where})
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) {source}', [query, *params])
+        count = cursor.fetchone()[0]
+        cursor.execute(f"""
+            SELECT e.id, e.model, e.object_id, ts_rank_cd(e.document, websearch_to_tsquery('english', %s)) AS rank
+            {source}
+            ORDER BY rank DESC, e.id
+            LIMIT %s OFFSET %s
+        """, [query, query, *params, limit, offset])
+        return count, cursor.fetchall()
+
+
+def _postgres_snippets(query, entry_ids):
+    options = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords=32, MinWords=8'
+    sql = """
+        SELECT id, title, ts_headline('english', body, websearch_to_tsquery('english', %s), %s)
+        FROM core_searchentry
+        WHERE id = ANY(%s)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [query, options, list(entry_ids)])
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+
+def _scope_sql(scopes):
+    """
+    SQL matching entries of the given labels whose rows are in scope.
+    ``scopes`` maps each model label to a ``values('pk')`` queryset of the
+    visible rows, or to None when all of them are visible.
+    """
+    branches, params = [], []
+    for label, visible in scopes.items():
+        if visible is None:
+            branches.append('e.model = %s')
+            params.append(label)
+        else:
+            subquery, subquery_params = visible.query.sql_with_params()
+            branches.append(f'(e.model = %s AND e.object_id IN ({subquery}))')
+            params.extend([label, *subquery_params])
+    return ' OR '.join(branches), params
+
+
+def ranked_hits(query, scopes, limit, offset=0):
+    """
+    Return (count, rows) for the entries matching ``query`` within
+    ``scopes`` (see _scope_sql): the total number of matches and up to
+    ``limit`` (entry_id, model label, object_id, rank) rows from
+    ``offset``, best first.
+    """
+    if not scopes or not query.strip():
+        return 0, []
+    if connection.vendor == 'postgresql':
+        return _postgres_ranked(query, scopes, limit, offset)
+    if connection.vendor == 'sqlite':
+        return _sqlite_ranked(query, scopes, limit, offset)
+    raise NotImplementedError(f'Full-text search is not supported on {connection.vendor}')
+
+
+def snippets(query, entry_ids):
+    """Return {entry_id: (title, highlighted snippet)} for the given entries only."""
+    if not entry_ids:
+        return {}
+    if connection.vendor == 'postgresql':
+        return _postgres_snippets(query, entry_ids)
+    return _sqlite_snippets(query, entry_ids)
+
+
+def search(query, user, types=None, offset=0, limit=20):
+    """
+    Rank the matches for ``query`` across ``types`` that ``user`` can see.
+    Returns the number of them and one page of (search_type, object_id,
+    entry_id, rank) tuples, best first.
+
+    Each type's AccessPolicy scope is applied inside the ranked query, as
+    an ``object_id IN (...)`` subquery, so the ranking, the page and the
+    count only ever see visible rows.
+    """
+    registry = get_types()
+    selected = [registry[name] for name in (types or registry) if name in registry]
+    by_label = {search_type.label: search_type for search_type in selected}
+    scopes = {}
+    for label, search_type in by_label.items():
+        scope = search_type.policy.get_scope(user)
+        scopes[label] = None if scope is None else (
+            search_type.model.objects.filter(scope).order_by().values('pk')
+        )
+    count, rows = ranked_hits(query, scopes, limit, offset)
+    return count, [(by_label[label], object_id, entry_id, rank) for entry_id, label, object_id, rank in rows]
@@ -1,8 +1,93 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from .models import AuditLog
 
+
+class SparseFieldsetMixin:
+    """
+    Let clients trim a serializer with ``?fields=`` and ``?omit=``.
+
+    Both take comma separated field names. Nested serializers are addressed
+    with a dotted prefix (``?fields=id,tasks.title``) and are left whole when
+    no name carries their prefix. Only safe methods are trimmed, so writes
+    still validate every field. ``is_sparse`` tells ``apply_eager_loading``
+    that unused columns can be dropped from the query.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    is_sparse = False
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+
+        params = getattr(request, 'query_params', request.GET)
+        prefix = self.get_sparse_fieldset_prefix()
+        requested = self.parse_field_names(params.get(self.fields_query_param), prefix)
+        omitted = self.parse_field_names(params.get(self.omit_query_param), prefix)
+
+        if requested:
+            requested = {name.split('.')[0] for name in requested}
+            for name in list(fields):
+                if name not in requested:
+                    fields.pop(name)
+                    self.is_sparse = True
+        for name in omitted:
+            if '.' not in name and fields.pop(name, None) is not None:
+                self.is_sparse = True
+        return fields
+
+    def get_sparse_fieldset_prefix(self):
+        names = []
+        node = self
+        while node is not None:
+            if node.field_name:
+                names.append(node.field_name)
+            node = node.parent
+        base = self.context.get('sparse_fieldset_prefix')
+        if base:
+            names.append(base)
+        return '.'.join(reversed(names))
+
+    def parse_field_names(self, value, prefix):
+        if not value:
+            return []
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        if not prefix:
+            return names
+        return [name[len(prefix) + 1:] for name in names if name.startswith(prefix + '.')]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that resolves against ``context['bulk_related']``.
+
+    Bulk endpoints load every referenced row with one ``in_bulk()`` per
+    model and pass ``{Model: {pk: obj}}`` in the context, so validating
+    hundreds of items doesn't run one query per foreign key.
+    """
+
+    def to_internal_value(self, data):
+        queryset = self.get_queryset()
+        preloaded = self.context.get('bulk_related', {}).get(queryset.model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = queryset.model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in preloaded:
+            self.fail('does_not_exist', pk_value=data)
+        return preloaded[pk]
+
+
 class AuditLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = AuditLog
         fields = '__all__'
-        read_only_fields = ['created_at']
\ No newline at end of file
+        read_only_fields = ['created_at']
@@ -0,0 +1,30 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+
+def is_asgi(request):
+    """Whether ``request`` (a Django or DRF request) is being served over ASGI."""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def aiterate(iterable):
+    """
+    Yield the items of the sync ``iterable`` one at a time, each produced in
+    the request's sync thread. Under ASGI, Django collects a sync streaming
+    body into a list before sending any of it, so large bodies must be async.
+    """
+    iterator = iter(iterable)
+    done = object()
+    try:
+        while (item := await sync_to_async(next)(iterator, done)) is not done:
+            yield item
+    finally:
+        # Runs when the client goes away mid-stream too
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def streaming_content(request, iterable):
+    """``iterable`` as a streaming response body that is sent as it is produced under WSGI and ASGI alike."""
+    return aiterate(iterable) if is_asgi(request) else iterable
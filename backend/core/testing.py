@@ -0,0 +1,28 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+class APITestCase(TestCase):
+    """
+    TestCase for the API: clients authenticated as a given user, and upper
+    bounds on the queries a block runs. The test runner also fails any
+    request that goes over its view's query budget.
+    """
+
+    def client_for(self, user):
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(user)
+        return client
+
+    @contextmanager
+    def assertMaxQueries(self, limit):
+        with CaptureQueriesContext(connection) as queries:
+            yield queries
+        self.assertLessEqual(len(queries), limit, '\n'.join(
+            [f'{len(queries)} queries executed, at most {limit} expected:']
+            + [query['sql'] for query in queries.captured_queries]
+        ))
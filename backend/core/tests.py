@@ -1,3 +1,182 @@
-from django.test import TestCase
+from django.db import connection
+from unittest import mock
 
-# Create your tests here.
+from django.core.handlers.asgi import ASGIHandler
+from django.http import StreamingHttpResponse
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from comments.models import Comment
+from projects.models import Project, Task
+from projects.views import ProjectViewSet
+from . import events, search
+from .asgi import EventStreamASGIHandler
+from .mixins import QueryBudgetExceeded
+from .models import SearchEntry
+from .testing import APITestCase
+
+
+class SearchAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role='admin')
+        cls.developer = User.objects.create_user('dev', password='x', role='developer')
+        task = Task.objects.create(title='Planning', project=Project.objects.create(name='Finance', owner=cls.admin))
+        comments = Comment.objects.bulk_create(
+            Comment(task=task, user=cls.admin, content=f'Quarterly budget draft {i}') for i in range(1200)
+        )
+        # bulk_create sends no post_save, so index them here
+        search.index_objects(Comment, comments)
+        cls.own = Comment.objects.create(task=task, user=cls.developer, content='My quarterly budget notes')
+
+    def search(self, user, **params):
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(user)
+        response = client.get('/api/search/', {'q': 'quarterly budget', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_visibility_is_applied_before_ranking(self):
+        data = self.search(self.developer)
+        self.assertEqual(data['count'], 1)
+        self.assertEqual([(hit['type'], hit['id']) for hit in data['results']], [('comment', self.own.pk)])
+        self.assertFalse(data['has_more'])
+
+    def test_count_is_not_capped(self):
+        self.assertEqual(self.search(self.admin, type='comment')['count'], 1201)
+
+    def test_pages_cover_every_hit_once(self):
+        seen = []
+        page = 1
+        while True:
+            data = self.search(self.admin, type='comment', page=page, page_size=100)
+            seen += [hit['id'] for hit in data['results']]
+            if not data['has_more']:
+                break
+            page += 1
+        self.assertEqual(page, 13)
+        self.assertEqual(len(seen), 1201)
+        self.assertEqual(len(set(seen)), 1201)
+
+    def test_comments_are_indexed_as_body_only(self):
+        hit = self.search(self.developer)['results'][0]
+        self.assertEqual(hit['title'], '')
+        self.assertIn('<mark>', hit['snippet'])
+
+
+class SearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role='admin')
+        cls.task = Task.objects.create(title='Doomed', project=Project.objects.create(name='P', owner=cls.admin))
+        for i in range(3):
+            Comment.objects.create(task=cls.task, user=cls.admin, content=f'Comment {i}')
+
+    def test_task_destroy_removes_its_comments_entries_in_one_query(self):
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.delete(f'/api/projects/tasks/{self.task.pk}/')
+        self.assertEqual(response.status_code, 204)
+
+        removals = [q for q in queries.captured_queries if q['sql'].startswith('DELETE FROM "core_searchentry"')]
+        self.assertEqual(len(removals), 1)
+        self.assertFalse(SearchEntry.objects.filter(model__in=['projects.task', 'comments.comment']).exists())
+
+
+@mock.patch.object(ProjectViewSet, 'query_budget', {'create': 1})
+class QueryBudgetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role='admin')
+
+    def create_project(self):
+        return self.client_for(self.admin).post('/api/projects/projects/', {'name': 'Over budget'})
+
+    def test_exceeding_the_budget_rolls_the_write_back(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.create_project()
+        self.assertFalse(Project.objects.exists())
+
+    @override_settings(QUERY_BUDGET_RAISE=False)
+    def test_exceeding_the_budget_only_warns_when_not_raising(self):
+        with self.assertLogs('core.mixins', 'WARNING'):
+            self.assertEqual(self.create_project().status_code, 201)
+        self.assertTrue(Project.objects.exists())
+
+
+class EventPublishTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role='admin')
+        cls.task = Task.objects.create(title='Watched', project=Project.objects.create(name='P', owner=cls.admin))
+
+    def test_nothing_is_built_without_subscribers(self):
+        with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as queries:
+            Comment.objects.create(task=self.task, user=self.admin, content='Unheard')
+        self.assertEqual(callbacks, [])
+        # The comment's INSERT and its search entry, but no event scope lookup of the task
+        self.assertFalse([q for q in queries.captured_queries if '"projects_task"' in q['sql']])
+
+    @mock.patch.object(events.LocalBackend, 'has_subscribers', return_value=True)
+    @mock.patch.object(events.LocalBackend, 'publish')
+    def test_events_are_built_at_commit(self, publish, has_subscribers):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            comment = Comment.objects.create(task=self.task, user=self.admin, content='Heard')
+        publish.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+        event = publish.call_args.args[0]
+        self.assertEqual((event['model'], event['action'], event['id']), ('comment', 'created', comment.pk))
+        self.assertEqual(event['scope']['owner'], self.admin.pk)
+        self.assertEqual(event['data']['task_title'], 'Watched')
+
+    @mock.patch.object(events.LocalBackend, 'has_subscribers', return_value=True)
+    @mock.patch.object(events.LocalBackend, 'publish')
+    def test_deletion_scope_is_read_before_commit(self, publish, has_subscribers):
+        task_id = self.task.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.delete()
+        event = publish.call_args.args[0]
+        self.assertEqual((event['model'], event['action'], event['id']), ('task', 'deleted', task_id))
+        self.assertEqual(event['scope'], {'assigned_to': None})
+
+
+class EventBackendCheckTests(TestCase):
+    def test_configured_workers(self):
+        self.assertEqual(events.configured_workers(['gunicorn', 'config.asgi:application'], {}), 1)
+        self.assertEqual(events.configured_workers(['gunicorn', '-w', '4'], {}), 4)
+        self.assertEqual(events.configured_workers(['gunicorn', '--workers=3'], {}), 3)
+        self.assertEqual(events.configured_workers(['gunicorn'], {'WEB_CONCURRENCY': '2'}), 2)
+        self.assertEqual(events.configured_workers(['gunicorn', '-w2'], {'GUNICORN_CMD_ARGS': '--workers 5'}), 2)
+
+    @override_settings(EVENTS_BACKEND='core.events.LocalBackend')
+    def test_local_backend_with_several_workers_warns(self):
+        with mock.patch.object(events, 'configured_workers', return_value=4), \
+                self.assertLogs('core.events', 'WARNING'):
+            events.check_backend()
+        with mock.patch.object(events, 'configured_workers', return_value=1), \
+                self.assertNoLogs('core.events', 'WARNING'):
+            events.check_backend()
+
+
+class ASGIStreamingTests(TestCase):
+    async def test_sync_streaming_response_is_sent_chunk_by_chunk(self):
+        produced = []
+
+        def body():
+            for chunk in (b'one', b'two', b'three'):
+                produced.append(chunk)
+                yield chunk
+
+        handler = EventStreamASGIHandler()
+        with mock.patch.object(ASGIHandler, 'get_response_async', return_value=StreamingHttpResponse(body())):
+            response = await handler.get_response_async(AsyncRequestFactory().get('/api/projects/tasks/1/files.zip/'))
+        self.assertTrue(response.is_async)
+        chunks = aiter(response)
+        self.assertEqual(await anext(chunks), b'one')
+        self.assertEqual(produced, [b'one'])
+        self.assertEqual([chunk async for chunk in chunks], [b'two', b'three'])
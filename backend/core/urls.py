@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import HealthCheckView, RootAPIView
+from .views import EventStreamView, HealthCheckView, SearchView, RootAPIView
 
 urlpatterns = [
     path('', RootAPIView.as_view(), name='api-root'),
     path('api/health/', HealthCheckView.as_view(), name='health-check'),
+    path('api/search/', SearchView.as_view(), name='search'),
+    path('api/events/', EventStreamView.as_view(), name='events'),
 ]
\ No newline at end of file
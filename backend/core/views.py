@@ -1,9 +1,18 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.db import connections
 from django.db.utils import OperationalError
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from . import events, search
 
 class HealthCheckView(APIView):
     permission_classes = [AllowAny]
@@ -34,6 +43,132 @@ class RootAPIView(APIView):
                 "health_check": "/api/health/",
                 "register": "/api/accounts/register/",
                 "login": "/api/accounts/login/",
+                "search": "/api/search/",
+                "events": "/api/events/",
                 "docs": "/swagger/"
             }
-        })
\ No newline at end of file
+        })
+
+class SearchView(APIView):
+    """
+    Full-text search over every type registered with core.search.
+
+    GET /api/search/?q=<text>[&type=task,comment][&page=1][&page_size=20]
+    Hits are ranked best first and only include objects the user could
+    open through the regular endpoints.
+    """
+    permission_classes = [IsAuthenticated]
+    page_size = 20
+    max_page_size = 100
+
+    def get_int_param(self, request, name, default, maximum=None):
+        value = request.query_params.get(name)
+        if value in (None, ''):
+            return default
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValidationError({name: 'Must be an integer.'})
+        if value < 1:
+            raise ValidationError({name: 'Must be a positive integer.'})
+        return min(value, maximum) if maximum else value
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'This parameter is required.'})
+
+        types = None
+        if request.query_params.get('type'):
+            types = [name.strip() for name in request.query_params['type'].split(',') if name.strip()]
+            unknown = set(types) - set(search.get_types())
+            if unknown:
+                raise ValidationError({'type': f"Unknown type(s): {', '.join(sorted(unknown))}"})
+
+        page = self.get_int_param(request, 'page', 1)
+        page_size = self.get_int_param(request, 'page_size', self.page_size, self.max_page_size)
+
+        start = (page - 1) * page_size
+        count, page_hits = search.search(query, request.user, types, offset=start, limit=page_size)
+        texts = search.snippets(query, [entry_id for _, _, entry_id, _ in page_hits])
+
+        results = []
+        for search_type, object_id, entry_id, rank in page_hits:
+            title, snippet = texts.get(entry_id, ('', ''))
+            results.append({
+                'type': search_type.name,
+                'id': object_id,
+                'title': title,
+                'snippet': snippet,
+                'rank': rank,
+            })
+
+        return Response({
+            'count': count,
+            'page': page,
+            'page_size': page_size,
+            'has_more': start + page_size < count,
+            'results': results,
+        })
+
+
+class EventStreamView(View):
+    """
+    Server-Sent Events stream of create/update/delete events.
+
+    GET /api/events/?token=<JWT access token>[&models=task,comment]
+    EventSource can't send headers, so the access token may come in the
+    query string; an ``Authorization: Bearer`` header works too. Each
+    message is ``{model, action, id, data}``. ``removed`` means a write
+    took the row out of the user's view. After a reconnect, clients should
+    catch up through the list endpoints (delta sync or a plain refetch),
+    since events are not replayed. Needs an ASGI server.
+    """
+    retry_ms = 5000
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({'detail': 'The event stream is only served over ASGI.'}, status=501)
+
+        raw_token = request.GET.get('token')
+        header = request.headers.get('Authorization', '')
+        if not raw_token and header.startswith('Bearer '):
+            raw_token = header.split(' ', 1)[1]
+        if not raw_token:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+        try:
+            user = await sync_to_async(self.authenticate)(raw_token)
+        except InvalidToken as exc:
+            return JsonResponse(exc.detail, status=401)
+        except TokenError as exc:
+            return JsonResponse({'detail': str(exc)}, status=401)
+
+        sources = events.get_sources()
+        models = set(sources)
+        if request.GET.get('models'):
+            models = {name.strip() for name in request.GET['models'].split(',')}
+            unknown = models - set(sources)
+            if unknown:
+                return JsonResponse({'models': f"Unknown model(s): {', '.join(sorted(unknown))}"}, status=400)
+
+        subscription = await events.broker.subscribe(user, models)
+        response = StreamingHttpResponse(self.stream(subscription), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def authenticate(self, raw_token):
+        authentication = JWTAuthentication()
+        user = authentication.get_user(authentication.get_validated_token(raw_token))
+        # Load the manager visibility set now; filtering later runs on the event loop
+        user.get_visible_user_ids()
+        return user
+
+    async def stream(self, subscription):
+        try:
+            yield f'retry: {self.retry_ms}\n\n'
+            while (message := await subscription.queue.get()) is not None:
+                yield message
+        finally:
+            events.broker.unsubscribe(subscription)
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class FilesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'files'
+
+    def ready(self):
+        from core import events
+        from . import signals  # noqa: F401
+        from .models import File
+        from .permissions import FilePolicy
+        from .serializers import FileSerializer
+
+        events.register('file', File, FileSerializer, policy=FilePolicy())
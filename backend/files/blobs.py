@@ -0,0 +1,116 @@
+import hashlib
+from collections import Counter
+
+from django.core.files import File as DjangoFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Blob
+
+CHUNK_SIZE = 64 * 1024
+
+
+class HashingReader:
+    """
+    Read-only stream over ``source`` that counts and SHA-256 hashes bytes as
+    they pass through, so storage can consume it chunk by chunk without the
+    content ever being held in memory.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.size = 0
+        self.hash = hashlib.sha256()
+
+    def read(self, size=CHUNK_SIZE):
+        data = self.source.read(size)
+        self.size += len(data)
+        self.hash.update(data)
+        return data
+
+    @property
+    def checksum(self):
+        return self.hash.hexdigest()
+
+
+def digest(stream):
+    """(checksum, size) of everything left in ``stream``."""
+    reader = HashingReader(stream)
+    while reader.read():
+        pass
+    return reader.checksum, reader.size
+
+
+def blob_name(checksum):
+    return f'uploads/blobs/{checksum[:2]}/{checksum[2:4]}/{checksum}'
+
+
+def store(content):
+    """Add a reference to the blob holding seekable ``content``, writing it only if it is new."""
+    content.seek(0)
+    checksum, size = digest(content)
+    content.seek(0)
+    return acquire(checksum, size, content)
+
+
+def acquire(checksum, size, content):
+    """
+    Return the blob for ``checksum`` with one more reference. ``content``
+    is only read, to write a new blob, when no blob has these bytes yet.
+    """
+    if Blob.objects.filter(checksum=checksum).update(ref_count=F('ref_count') + 1):
+        return Blob.objects.get(checksum=checksum)
+
+    reader = HashingReader(content)
+    name = default_storage.save(blob_name(checksum), DjangoFile(reader))
+    if reader.checksum != checksum:
+        default_storage.delete(name)
+        raise ValueError(f'Content changed while it was stored: expected {checksum}, got {reader.checksum}')
+    blob, created = adopt(checksum, size, name)
+    if not created:
+        # Another upload of the same bytes got there first
+        default_storage.delete(name)
+    return blob
+
+
+def adopt(checksum, size, name):
+    """
+    Return (blob, created) for ``checksum`` with one more reference, making
+    the already stored file ``name`` the blob if there isn't one yet.
+    """
+    try:
+        with transaction.atomic():
+            return Blob.objects.create(checksum=checksum, file=name, size=size, ref_count=1), True
+    except IntegrityError:
+        Blob.objects.filter(checksum=checksum).update(ref_count=F('ref_count') + 1)
+        return Blob.objects.get(checksum=checksum), False
+
+
+def release(blob_ids):
+    """
+    Drop one reference per id in ``blob_ids``. Blobs left without
+    references are deleted, and their bytes once the transaction commits.
+    """
+    references = Counter(blob_id for blob_id in blob_ids if blob_id is not None)
+    if not references:
+        return
+    by_count = {}
+    for blob_id, count in references.items():
+        by_count.setdefault(count, []).append(blob_id)
+    for count, ids in by_count.items():
+        Blob.objects.filter(pk__in=ids).update(ref_count=F('ref_count') - count)
+
+    # No savepoint of its own inside a caller's transaction: a failure here
+    # has to undo the caller's write anyway
+    with transaction.atomic(savepoint=False):
+        # Locked so a concurrent acquire() can't revive a blob whose bytes are going
+        orphans = list(
+            Blob.objects.select_for_update()
+            .filter(pk__in=references, ref_count__lte=0)
+            .values_list('pk', 'file', 'thumbnail', 'preview')
+        )
+        if orphans:
+            Blob.objects.filter(pk__in=[pk for pk, *_ in orphans]).delete()
+            names = [name for _, *stored in orphans for name in stored if name]
+            transaction.on_commit(lambda: [default_storage.delete(name) for name in names])
@@ -0,0 +1,148 @@
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from core.streaming import aiterate, is_asgi
+from .blobs import CHUNK_SIZE
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """
+    ``length`` bytes of an open file starting at ``start``. Reads stop at
+    the end of the range. Under WSGI, ``fileno()`` lets the server's
+    file_wrapper sendfile() Content-Length bytes from the current offset;
+    under ASGI the range is iterated CHUNK_SIZE bytes at a time.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def __iter__(self):
+        try:
+            while data := self.read(CHUNK_SIZE):
+                yield data
+        finally:
+            self.close()
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def validators(file):
+    """Strong ETag and Last-Modified for a stored File."""
+    etag = quote_etag(file.checksum or f'{file.pk}-{int(file.updated_at.timestamp())}')
+    return etag, int(file.updated_at.timestamp())
+
+
+def parse_range(header, size):
+    """
+    Return (start, length) for a single ``bytes=`` range, None to send the
+    whole file, or False when the range can't be satisfied. Multiple ranges
+    are answered with the whole file, which RFC 9110 allows.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = min(int(last), size)
+        return (size - length, length) if length else False
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end - start + 1
+
+
+def range_applies(request, etag, last_modified):
+    """If-Range: only honour Range when the client's copy is still current."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def content_disposition(file_name, as_attachment=True):
+    return f"{'attachment' if as_attachment else 'inline'}; filename*=UTF-8''{quote(file_name)}"
+
+
+def serve_file(request, file):
+    """Send a File's content as a download."""
+    etag, last_modified = validators(file)
+    return serve(request, file.file, file.mime_type, file.file_name, etag, last_modified)
+
+
+def serve(request, stored, content_type, file_name, etag, last_modified, as_attachment=True):
+    """
+    Send the stored file ``stored`` to the client. Behind a proxy configured
+    through FILE_DOWNLOAD_OFFLOAD, respond with headers only and let it
+    transfer the bytes; otherwise stream it here, one chunk in memory at a
+    time, with Range and conditional request support.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    offload = settings.FILE_DOWNLOAD_OFFLOAD
+    if offload == 'x-accel-redirect':
+        # nginx answers Range and conditional requests itself
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.FILE_DOWNLOAD_ACCEL_PREFIX + quote(stored.name)
+    elif offload == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = stored.path
+    else:
+        response = stream(request, stored, content_type, etag, last_modified)
+        if response.status_code == 416:
+            return response
+
+    response['Content-Disposition'] = content_disposition(file_name, as_attachment)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def stream(request, stored, content_type, etag, last_modified):
+    size = stored.size
+    window = None
+    if 'Range' in request.headers and range_applies(request, etag, last_modified):
+        window = parse_range(request.headers['Range'], size)
+        if window is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    start, length = window or (0, size)
+    body = FileRange(stored.open('rb'), start, length)
+    content_type = content_type or 'application/octet-stream'
+    status = 206 if window else 200
+    if is_asgi(request):
+        response = StreamingHttpResponse(aiterate(body), content_type=content_type, status=status)
+    else:
+        response = FileResponse(body, content_type=content_type, status=status)
+    response['Content-Length'] = length
+    response['Accept-Ranges'] = 'bytes'
+    if window:
+        response['Content-Range'] = f'bytes {start}-{start + length - 1}/{size}'
+    return response
@@ -0,0 +1,42 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from files import blobs
+from files.models import File
+
+
+class Command(BaseCommand):
+    help = 'Move files stored before the blob store into it, keeping one stored copy per distinct content'
+
+    def handle(self, *args, **options):
+        moved = duplicates = freed = missing = 0
+        pending = File.objects.filter(blob__isnull=True).only('id', 'file').order_by('pk')
+        for file in pending.iterator(chunk_size=500):
+            name = file.file.name
+            try:
+                with default_storage.open(name, 'rb') as content:
+                    checksum, size = blobs.digest(content)
+            except FileNotFoundError:
+                missing += 1
+                self.stderr.write(f'File {file.pk}: {name} is missing from storage, skipped')
+                continue
+
+            with transaction.atomic():
+                # The first copy of some content becomes its blob where it
+                # lies; later copies point at that blob and are deleted
+                blob, created = blobs.adopt(checksum, size, name)
+                File.objects.filter(pk=file.pk).update(
+                    blob=blob, file=blob.file.name, file_size=size, checksum=checksum,
+                )
+            moved += 1
+            if not created and blob.file.name != name:
+                default_storage.delete(name)
+                duplicates += 1
+                freed += size
+
+        self.stdout.write(
+            f'Moved {moved} files into the blob store: {duplicates} duplicate copies deleted, '
+            f'{freed / 1024 / 1024:.1f} MiB freed'
+            + (f', {missing} missing files skipped' if missing else '')
+        )
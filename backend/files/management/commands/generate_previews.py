@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from files import previews
+from files.models import Blob, File
+
+
+class Command(BaseCommand):
+    help = (
+        'Render thumbnails and previews that were never generated: files stored before previews '
+        'existed, and jobs left pending when the upload queue was full or a worker stopped'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true', help='Also retry blobs whose rendering failed')
+
+    def handle(self, *args, **options):
+        statuses = ['', 'pending'] + (['failed'] if options['retry_failed'] else [])
+        blobs = (
+            File.objects.filter(blob__preview_status__in=statuses, mime_type__in=previews.supported_types())
+            .order_by('blob_id').values_list('blob_id', 'mime_type').distinct()
+        )
+        done = failed = 0
+        seen = set()
+        for blob_id, mime_type in blobs.iterator():
+            if blob_id in seen:
+                continue
+            seen.add(blob_id)
+            # Rendered in this process, one at a time, so the sweep never
+            # competes with the web workers' pools for more than one core
+            Blob.objects.filter(pk=blob_id).update(preview_status='pending')
+            previews.generate(blob_id, mime_type)
+            if Blob.objects.filter(pk=blob_id, preview_status='ready').exists():
+                done += 1
+            else:
+                failed += 1
+        self.stdout.write(f'Rendered previews of {done} blobs' + (f', {failed} failed' if failed else ''))
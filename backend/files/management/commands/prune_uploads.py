@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from files import uploads
+from files.models import FileUpload
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked uploads, and their stored parts, that have not been touched for a while'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Keep uploads active within this many hours')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = FileUpload.objects.filter(updated_at__lt=cutoff)
+        count = 0
+        for upload in stale.iterator():
+            uploads.discard(upload)
+            count += 1
+        self.stdout.write(f'Deleted {count} uploads idle since {cutoff:%Y-%m-%d %H:%M}')
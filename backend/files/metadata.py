@@ -0,0 +1,97 @@
+import mimetypes
+import os
+
+SNIFF_BYTES = 8 * 1024
+
+# (offset, magic bytes, MIME type), checked in order
+SIGNATURES = [
+    (0, b'%PDF-', 'application/pdf'),
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'GIF87a', 'image/gif'),
+    (0, b'GIF89a', 'image/gif'),
+    (0, b'II*\x00', 'image/tiff'),
+    (0, b'MM\x00*', 'image/tiff'),
+    (0, b'\x00\x00\x01\x00', 'image/vnd.microsoft.icon'),
+    (8, b'WEBP', 'image/webp'),
+    (8, b'AVI ', 'video/x-msvideo'),
+    (8, b'WAVE', 'audio/wav'),
+    (4, b'ftypqt', 'video/quicktime'),
+    (4, b'ftypheic', 'image/heic'),
+    (4, b'ftyp', 'video/mp4'),
+    (0, b'\x1a\x45\xdf\xa3', 'video/webm'),
+    (0, b'ID3', 'audio/mpeg'),
+    (0, b'OggS', 'audio/ogg'),
+    (0, b'fLaC', 'audio/flac'),
+    (0, b'PK\x03\x04', 'application/zip'),
+    (0, b'PK\x05\x06', 'application/zip'),
+    (0, b'\x1f\x8b', 'application/gzip'),
+    (0, b'BZh', 'application/x-bzip2'),
+    (0, b'\xfd7zXZ\x00', 'application/x-xz'),
+    (0, b"7z\xbc\xaf'\x1c", 'application/x-7z-compressed'),
+    (0, b'Rar!\x1a\x07', 'application/vnd.rar'),
+    (0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/x-ole-storage'),
+    (0, b'MZ', 'application/vnd.microsoft.portable-executable'),
+    (0, b'\x7fELF', 'application/x-elf'),
+    (0, b'SQLite format 3\x00', 'application/vnd.sqlite3'),
+]
+
+# Containers whose specific type only the file extension tells apart
+CONTAINERS = {
+    'application/zip': ('application/vnd.openxmlformats-officedocument', 'application/vnd.oasis.opendocument',
+                        'application/epub+zip', 'application/java-archive'),
+    'application/x-ole-storage': ('application/msword', 'application/vnd.ms-', 'application/x-msi'),
+    'video/mp4': ('video/', 'audio/mp4', 'image/avif', 'image/heif'),
+}
+
+
+def sniff(head, file_name=''):
+    """
+    MIME type of a file from its first few KB. Known signatures win over
+    the name, so a renamed file is reported as what it is; the name only
+    picks the specific type inside a container format, or the type of
+    content without a signature (text, for the most part).
+    """
+    guessed = mimetypes.guess_type(file_name)[0]
+    for offset, magic, mime_type in SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            if guessed and guessed.startswith(CONTAINERS.get(mime_type, ())):
+                return guessed
+            return mime_type
+    if guessed:
+        return guessed
+    if looks_like_text(head):
+        return 'text/plain'
+    return 'application/octet-stream'
+
+
+def looks_like_text(head):
+    if not head or b'\x00' in head:
+        return False
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as exc:
+        # The sample may end partway through a multi-byte character
+        return exc.start >= len(head) - 3
+    return True
+
+
+def clean_name(name):
+    return os.path.basename((name or '').replace('\\', '/'))
+
+
+def extract(upload):
+    """
+    file_name, mime_type and file_size for a Django UploadedFile. Only the
+    first SNIFF_BYTES are read; the size is the one the upload handler
+    counted while receiving the file.
+    """
+    upload.seek(0)
+    head = upload.read(SNIFF_BYTES)
+    upload.seek(0)
+    file_name = clean_name(upload.name)
+    return {
+        'file_name': file_name,
+        'mime_type': sniff(head, file_name),
+        'file_size': upload.size,
+    }
@@ -2,11 +2,69 @@ from django.db import models
 from projects.models import Task
 from accounts.models import User
 
+class Blob(models.Model):
+    """
+    Stored bytes shared by every File with the same content, keyed by
+    SHA-256. ``ref_count`` is the number of Files pointing at it; the blob
+    and its bytes go when it reaches zero.
+    """
+    PREVIEW_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
+    checksum = models.CharField(max_length=64, unique=True)
+    file = models.FileField(max_length=255)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    # Downscaled renderings stored next to the file; blank until generated
+    preview_status = models.CharField(max_length=10, choices=PREVIEW_STATUS_CHOICES, blank=True)
+    thumbnail = models.FileField(max_length=255, blank=True)
+    preview = models.FileField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
 class File(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='files')
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='files')
-    file = models.FileField(upload_to='uploads/')
+    # Names the blob's stored file; the blob owns the bytes
+    file = models.FileField(upload_to='uploads/', max_length=255)
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, null=True, blank=True, related_name='files')
     file_name = models.CharField(max_length=255)
     mime_type = models.CharField(max_length=100)
-    file_size = models.IntegerField()
+    file_size = models.BigIntegerField()
+    # Hex SHA-256 of the content
+    checksum = models.CharField(max_length=64, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['uploaded_at', 'id'], name='file_uploaded_id_idx'),
+        ]
+
+
+class FileUpload(models.Model):
+    """A chunked upload in progress. Its parts stay in storage until it is completed."""
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='file_uploads')
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='file_uploads')
+    file_name = models.CharField(max_length=255)
+    mime_type = models.CharField(max_length=100, blank=True)
+    # Declared by the client up front and checked on completion
+    file_size = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class FileUploadPart(models.Model):
+    upload = models.ForeignKey(FileUpload, on_delete=models.CASCADE, related_name='parts')
+    part_number = models.PositiveIntegerField()
+    file = models.FileField(max_length=255)
+    size = models.BigIntegerField()
+    checksum = models.CharField(max_length=64)
+    uploaded_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['upload', 'part_number']
+        ordering = ['part_number']
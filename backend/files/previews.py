@@ -0,0 +1,207 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Blob, File
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = 256
+PREVIEW_SIZE = 1024
+PDF_TIMEOUT_SECONDS = 60
+
+IMAGE_TYPES = {'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/bmp', 'image/tiff'}
+PDF_TYPE = 'application/pdf'
+
+
+def supported_types():
+    """MIME types this installation can preview: images need Pillow, PDFs poppler's pdftoppm."""
+    types = set()
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return types
+    types |= IMAGE_TYPES
+    if shutil.which('pdftoppm'):
+        types.add(PDF_TYPE)
+    return types
+
+
+def schedule(file):
+    """
+    Queue previews for a saved File's content once its transaction commits.
+    Content that already has (or is getting) previews is skipped, so a
+    deduplicated upload never renders twice.
+    """
+    if file.blob_id is None or file.mime_type not in supported_types():
+        return
+    claimed = Blob.objects.filter(pk=file.blob_id, preview_status='').update(preview_status='pending')
+    if claimed:
+        blob_id, mime_type = file.blob_id, file.mime_type
+        transaction.on_commit(lambda: submit(blob_id, mime_type))
+
+
+class PreviewPool:
+    """
+    A process pool for rendering with a bounded number of jobs in flight.
+
+    Rendering is CPU bound, so it runs in separate processes and never
+    holds the GIL web threads need. When FILE_PREVIEW_QUEUE_SIZE jobs are
+    already waiting, new ones are not queued: submit() returns at once and
+    the blob stays pending for ``manage.py generate_previews`` to pick up,
+    so a burst of uploads costs neither request latency nor unbounded
+    memory.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.slots = threading.BoundedSemaphore(queue_size)
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                # Spawned rather than forked: web servers run threads, and a
+                # fork copies whatever locks they hold at that moment. The
+                # initializer must not live in a module that imports models.
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=django.setup,
+                )
+            return self.executor
+
+    def submit(self, blob_id, mime_type):
+        if not self.slots.acquire(blocking=False):
+            logger.info('Preview queue full; blob %s left pending', blob_id)
+            return False
+        try:
+            future = self.get_executor().submit(generate, blob_id, mime_type)
+        except BrokenProcessPool:
+            self.slots.release()
+            self.reset()
+            return False
+        future.add_done_callback(self.finished)
+        return True
+
+    def finished(self, future):
+        self.slots.release()
+        exc = future.exception()
+        if isinstance(exc, BrokenProcessPool):
+            self.reset()
+        elif exc is not None:
+            logger.error('Preview job failed', exc_info=exc)
+
+    def reset(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+
+
+def get_pool():
+    global _pool
+    if _pool is None and settings.FILE_PREVIEW_WORKERS > 0:
+        _pool = PreviewPool(settings.FILE_PREVIEW_WORKERS, settings.FILE_PREVIEW_QUEUE_SIZE)
+    return _pool
+
+
+def submit(blob_id, mime_type):
+    pool = get_pool()
+    return pool.submit(blob_id, mime_type) if pool else False
+
+
+def generate(blob_id, mime_type):
+    """Render and store the previews of one pending blob. Runs in a pool process."""
+    blob = Blob.objects.filter(pk=blob_id, preview_status='pending').first()
+    if blob is None:
+        return
+    names = {}
+    try:
+        image = render_pdf(blob) if mime_type == PDF_TYPE else open_image(blob)
+        for field, size in (('preview', PREVIEW_SIZE), ('thumbnail', THUMBNAIL_SIZE)):
+            image.thumbnail((size, size))
+            names[field] = default_storage.save(f'{blob.file.name}.{field}.jpg', ContentFile(encode(image)))
+        status = 'ready'
+    except Exception:
+        logger.exception('Could not render previews of blob %s (%s)', blob_id, mime_type)
+        status = 'failed'
+
+    updated = Blob.objects.filter(pk=blob_id, preview_status='pending').update(preview_status=status, **names)
+    if not updated:
+        # The blob was deleted (or reset) while rendering
+        for name in names.values():
+            default_storage.delete(name)
+    elif names:
+        # The Files' representations gained preview URLs; move their
+        # validators on so conditional GETs don't answer 304
+        File.objects.filter(blob_id=blob_id).update(updated_at=timezone.now())
+
+
+def open_image(blob):
+    from PIL import Image, ImageOps
+
+    with default_storage.open(blob.file.name, 'rb') as source:
+        image = Image.open(source)
+        # Lets the JPEG decoder scale down while decoding, so large photos
+        # are never expanded in memory at full size
+        image.draft('RGB', (PREVIEW_SIZE, PREVIEW_SIZE))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    return image
+
+
+def render_pdf(blob):
+    """First page of a PDF, rendered by pdftoppm at preview size."""
+    from PIL import Image
+
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            path = default_storage.path(blob.file.name)
+        except NotImplementedError:
+            # Remote storage: pdftoppm needs a local copy
+            path = os.path.join(directory, 'source.pdf')
+            with default_storage.open(blob.file.name, 'rb') as source, open(path, 'wb') as target:
+                shutil.copyfileobj(source, target)
+        prefix = os.path.join(directory, 'page')
+        subprocess.run(
+            ['pdftoppm', '-f', '1', '-l', '1', '-singlefile', '-scale-to', str(PREVIEW_SIZE), '-jpeg', path, prefix],
+            check=True, capture_output=True, timeout=PDF_TIMEOUT_SECONDS,
+        )
+        with Image.open(f'{prefix}.jpg') as page:
+            page.load()
+            return page.copy()
+
+
+def encode(image):
+    from PIL import Image
+
+    if image.mode in ('RGBA', 'LA', 'P'):
+        # JPEG has no alpha: flatten transparency onto white
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=85, optimize=True)
+    return buffer.getvalue()
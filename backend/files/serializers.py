@@ -1,15 +1,64 @@
+import mimetypes
+
 from rest_framework import serializers
-from .models import File
+from rest_framework.reverse import reverse
+from .metadata import clean_name
+from .models import File, FileUpload, FileUploadPart
 from projects.models import Task
 from accounts.models import User
+from core.serializers import SparseFieldsetMixin
+
+class PreviewURLField(serializers.ReadOnlyField):
+    """URL of a File's ``thumbnail`` or ``preview`` image, null until one has been rendered."""
+
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        super().__init__(source=f'blob.{kind}', **kwargs)
+
+    def get_attribute(self, instance):
+        stored = super().get_attribute(instance)
+        return instance.pk if stored else None
 
-class FileSerializer(serializers.ModelSerializer):
+    def to_representation(self, pk):
+        return reverse(f'file-{self.kind}', kwargs={'pk': pk}, request=self.context.get('request'))
+
+
+class FileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     uploaded_by_username = serializers.CharField(source='uploaded_by.username', read_only=True)
     task_title = serializers.CharField(source='task.title', read_only=True)
+    thumbnail_url = PreviewURLField('thumbnail')
+    preview_url = PreviewURLField('preview')
     class Meta:
         model = File
         fields = [
             'id', 'task', 'task_title', 'uploaded_by', 'uploaded_by_username',
-            'file', 'file_name', 'mime_type', 'file_size', 'uploaded_at'
+            'file', 'file_name', 'mime_type', 'file_size', 'checksum', 'thumbnail_url', 'preview_url',
+            'uploaded_at', 'updated_at'
         ]
-        read_only_fields = ['uploaded_at', 'file_name', 'mime_type', 'file_size'] 
\ No newline at end of file
+        read_only_fields = ['uploaded_at', 'updated_at', 'file_name', 'mime_type', 'file_size', 'checksum']
+
+
+class FileUploadPartSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FileUploadPart
+        fields = ['part_number', 'size', 'checksum', 'uploaded_at']
+
+
+class FileUploadSerializer(serializers.ModelSerializer):
+    parts = FileUploadPartSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = FileUpload
+        fields = ['id', 'task', 'file_name', 'mime_type', 'file_size', 'parts', 'created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at']
+
+    def validate_file_name(self, value):
+        name = clean_name(value)
+        if not name:
+            raise serializers.ValidationError('A file name is required.')
+        return name
+
+    def validate(self, attrs):
+        if not attrs.get('mime_type'):
+            attrs['mime_type'] = mimetypes.guess_type(attrs['file_name'])[0] or 'application/octet-stream'
+        return attrs
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import cascades
+from . import blobs, previews
+from .models import File
+
+cascades.track(File)
+
+
+@receiver(post_save, sender=File)
+def schedule_previews(sender, instance, **kwargs):
+    # Also on updates, which may have replaced the content
+    previews.schedule(instance)
+
+
+@receiver(post_delete, sender=File)
+def release_blob(sender, instance, origin=None, **kwargs):
+    # Runs for cascades too (task and project deletes), so shared bytes are
+    # only removed with their last File. A cascade's Files are released together.
+    cascades.defer(origin, instance, blobs.release, instance.blob_id)
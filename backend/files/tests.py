@@ -1,3 +1,158 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from core.testing import APITestCase
+from projects.models import Project, Task
+from .blobs import CHUNK_SIZE
+from .models import Blob, File
+
+
+class FileTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role='admin')
+        cls.task = Task.objects.create(title='Files', project=Project.objects.create(name='P', owner=cls.admin))
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root, FILE_PREVIEW_WORKERS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = self.client_for(self.admin)
+        token = RefreshToken.for_user(self.admin).access_token
+        self.asgi_client = AsyncClient(authorization=f'Bearer {token}')
+
+    def upload(self, content, name='notes.txt'):
+        response = self.client.post('/api/files/files/', {
+            'task': self.task.pk, 'file': SimpleUploadedFile(name, content, content_type='text/plain'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+
+class FileUpdateTests(FileTestCase):
+    def test_replacing_content_with_patch(self):
+        file_id = self.upload(b'first version')
+        with self.assertMaxQueries(15):
+            response = self.client.patch(f'/api/files/files/{file_id}/', {
+                'file': SimpleUploadedFile('notes.txt', b'second version', content_type='text/plain'),
+            }, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Blob.objects.get().size, len(b'second version'))
+
+    def test_replacing_content_with_put(self):
+        file_id = self.upload(b'first version')
+        with self.assertMaxQueries(16):
+            response = self.client.put(f'/api/files/files/{file_id}/', {
+                'task': self.task.pk,
+                'file': SimpleUploadedFile('notes.txt', b'second version', content_type='text/plain'),
+            }, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Blob.objects.get().size, len(b'second version'))
+
+
+class FileDownloadTests(FileTestCase):
+    content = bytes(range(256)) * (CHUNK_SIZE // 256) * 3
+
+    async def test_download_streams_chunks_under_asgi(self):
+        file_id = await sync_to_async(self.upload)(self.content, name='data.bin')
+        response = await self.asgi_client.get(f'/api/files/files/{file_id}/download/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response]
+        self.assertEqual([len(chunk) for chunk in chunks], [CHUNK_SIZE] * 3)
+        self.assertEqual(b''.join(chunks), self.content)
+
+    async def test_range_streams_only_the_window_under_asgi(self):
+        file_id = await sync_to_async(self.upload)(self.content, name='data.bin')
+        start, end = CHUNK_SIZE - 10, 2 * CHUNK_SIZE + 9
+        response = await self.asgi_client.get(
+            f'/api/files/files/{file_id}/download/', headers={'range': f'bytes={start}-{end}'},
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Length'], str(end - start + 1))
+        self.assertEqual(b''.join([chunk async for chunk in response]), self.content[start:end + 1])
+
+
+class FileArchiveTests(FileTestCase):
+    async def test_archive_streams_before_it_is_built_under_asgi(self):
+        for name in ('a.bin', 'b.bin', 'c.bin'):
+            await sync_to_async(self.upload)(name.encode() * CHUNK_SIZE, name=name)
+        with mock.patch.object(default_storage, 'open', wraps=default_storage.open) as opened:
+            response = await self.asgi_client.get(f'/api/projects/tasks/{self.task.pk}/files.zip/')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            chunks = aiter(response)
+            first = await anext(chunks)
+            # Sent while the first member is still being copied
+            self.assertEqual(opened.call_count, 1)
+            body = first + b''.join([chunk async for chunk in chunks])
+        self.assertEqual(opened.call_count, 3)
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            self.assertEqual(archive.namelist(), ['a.bin', 'b.bin', 'c.bin'])
+            self.assertEqual(archive.read('c.bin'), b'c.bin' * CHUNK_SIZE)
+
+
+class FileReleaseTests(FileTestCase):
+    def test_task_delete_releases_its_files_blobs_together(self):
+        for content in (b'one', b'two', b'two'):
+            self.upload(content)
+        self.assertEqual(Blob.objects.count(), 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.task.delete()
+        releases = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "files_blob"')]
+        self.assertEqual(len(releases), 2)  # one per distinct reference count
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(File.objects.exists())
+
+
+class FileQueryTests(FileTestCase):
+    def setUp(self):
+        super().setUp()
+        self.developer = User.objects.create_user('dev', password='x', role='developer')
+        self.task.assigned_to = self.developer
+        self.task.save()
+        self.file_ids = [self.upload(f'content {i}'.encode()) for i in range(3)]
+
+    def test_list(self):
+        for user in (self.admin, self.developer):
+            client = self.client_for(user)
+            with self.assertMaxQueries(4):
+                self.assertEqual(client.get('/api/files/files/').status_code, 200)
+
+    def test_create(self):
+        with self.assertMaxQueries(8):
+            self.upload(b'one more')
+
+    def test_update_without_new_content(self):
+        with self.assertMaxQueries(5):
+            response = self.client.patch(f'/api/files/files/{self.file_ids[0]}/', {'task': self.task.pk})
+        self.assertEqual(response.status_code, 200)
+
+    def test_destroy(self):
+        with self.assertMaxQueries(9):
+            response = self.client.delete(f'/api/files/files/{self.file_ids[0]}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(Blob.objects.count(), 2)
+
+    def test_chunked_upload_create_and_destroy(self):
+        with self.assertMaxQueries(5):
+            response = self.client.post('/api/files/uploads/', {'task': self.task.pk, 'file_name': 'big.bin'})
+        self.assertEqual(response.status_code, 201)
+        with self.assertMaxQueries(6):
+            response = self.client.delete(f"/api/files/uploads/{response.data['id']}/")
+        self.assertEqual(response.status_code, 204)
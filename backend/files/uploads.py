@@ -0,0 +1,132 @@
+from contextlib import closing
+
+from django.core.files import File as DjangoFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from . import blobs, metadata
+from .blobs import CHUNK_SIZE, HashingReader
+from .models import File, FileUpload, FileUploadPart
+
+
+class ConcatenatedParts:
+    """Read the stored parts of an upload back to back as one stream."""
+
+    def __init__(self, parts):
+        self.parts = iter(parts)
+        self.current = None
+
+    def read(self, size=CHUNK_SIZE):
+        while True:
+            if self.current is None:
+                part = next(self.parts, None)
+                if part is None:
+                    return b''
+                self.current = default_storage.open(part.file.name, 'rb')
+            data = self.current.read(size)
+            if data:
+                return data
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+
+
+def parts_directory(upload):
+    return f'uploads/parts/{upload.pk}'
+
+
+def part_name(upload, part_number):
+    return f'{parts_directory(upload)}/{part_number}'
+
+
+def save_part(upload, part_number, stream, size):
+    """
+    Stream one ``size`` byte part into storage, replacing any earlier copy
+    of it, and return the FileUploadPart with its checksum. A part cut short
+    by a dropped connection is thrown away, so stored parts are always whole.
+    """
+    reader = HashingReader(stream)
+    name = default_storage.get_available_name(part_name(upload, part_number))
+    try:
+        name = default_storage.save(name, DjangoFile(reader))
+    except Exception:
+        default_storage.delete(name)
+        raise
+    if reader.size != size:
+        default_storage.delete(name)
+        raise ValidationError({'detail': f'Received {reader.size} of {size} bytes; upload the part again.'})
+    part, created = FileUploadPart.objects.get_or_create(
+        upload=upload, part_number=part_number,
+        defaults={'file': name, 'size': reader.size, 'checksum': reader.checksum},
+    )
+    if not created:
+        # A retried part: keep the new copy, drop the old one
+        previous = part.file.name
+        part.file, part.size, part.checksum = name, reader.size, reader.checksum
+        part.save()
+        if previous != name:
+            default_storage.delete(previous)
+    # Keeps an upload that is still receiving parts clear of prune_uploads
+    FileUpload.objects.filter(pk=upload.pk).update(updated_at=timezone.now())
+    return part
+
+
+def complete(upload, parts, checksum=None):
+    """
+    Replace the upload with the File it produced. The parts are hashed in a
+    read-only pass first, so content the blob store already holds is linked
+    without writing a byte and only new content is concatenated into a
+    blob. When the client sent the ``checksum`` it expects and the content
+    doesn't match, nothing is written and the parts are kept for another
+    attempt.
+    """
+    with closing(ConcatenatedParts(parts)) as content:
+        actual, size = blobs.digest(content)
+    if checksum and checksum.lower() != actual:
+        raise ValidationError({'checksum': f'Expected {checksum} but the parts add up to {actual}.'})
+    with default_storage.open(parts[0].file.name, 'rb') as first:
+        head = first.read(metadata.SNIFF_BYTES)
+    mime_type = metadata.sniff(head, upload.file_name)
+    if mime_type == 'application/octet-stream':
+        # Nothing recognisable: fall back to what the client declared
+        mime_type = upload.mime_type or mime_type
+    with closing(ConcatenatedParts(parts)) as content:
+        blob = blobs.acquire(actual, size, content)
+    try:
+        with transaction.atomic():
+            file = File.objects.create(
+                task_id=upload.task_id,
+                uploaded_by_id=upload.uploaded_by_id,
+                file_name=upload.file_name,
+                mime_type=mime_type,
+                blob=blob,
+                file=blob.file.name,
+                file_size=size,
+                checksum=actual,
+            )
+            discard(upload)
+    except Exception:
+        blobs.release([blob.pk])
+        raise
+    return file
+
+
+def discard(upload):
+    """Delete an upload and, once that commits, everything stored for its parts."""
+    directory = parts_directory(upload)
+    upload.delete()
+    transaction.on_commit(lambda: delete_directory(directory))
+
+
+def delete_directory(directory):
+    try:
+        _, names = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in names:
+        default_storage.delete(f'{directory}/{name}')
@@ -1,7 +1,8 @@
 from rest_framework.routers import DefaultRouter
-from .views import FileViewSet
+from .views import FileUploadViewSet, FileViewSet
 
 router = DefaultRouter()
 router.register(r'files', FileViewSet, basename='file')
+router.register(r'uploads', FileUploadViewSet, basename='file-upload')
 
 urlpatterns = router.urls 
\ No newline at end of file
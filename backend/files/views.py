@@ -1,39 +1,150 @@
-from rest_framework import viewsets, permissions
-from .models import File
-from .serializers import FileSerializer
+from django.conf import settings
+from django.db import transaction
+from django.utils.http import quote_etag
+from rest_framework import mixins, viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.response import Response
+from . import blobs, downloads, metadata, uploads
+from .models import File, FileUpload
+from .permissions import FilePolicy
+from .serializers import FileSerializer, FileUploadPartSerializer, FileUploadSerializer
 from projects.models import Task
 from accounts.models import User
-from django.db import models
-
-class IsAdminManagerOrTaskUser(permissions.BasePermission):
-    def has_object_permission(self, request, view, obj):
-        user = request.user
-        if user.role in ['admin', 'manager']:
-            return True
-        # User can access if they uploaded the file, are assigned to the task, or own the project
-        if obj.uploaded_by == user:
-            return True
-        if obj.task.assigned_to == user:
-            return True
-        if obj.task.project.owner == user:
-            return True
-        return False
-
-class FileViewSet(viewsets.ModelViewSet):
+from core.mixins import ConditionalGetMixin, EagerLoadingMixin, QueryBudgetMixin
+from core.permissions import PolicyPermission
+from core.pagination import KeysetPagination
+
+class FileKeysetPagination(KeysetPagination):
+    ordering_field = 'uploaded_at'
+
+class DownloadContentNegotiation(DefaultContentNegotiation):
+    """Downloads are the file's own bytes whatever Accept says; errors still render as JSON."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+class FileViewSet(QueryBudgetMixin, ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = File.objects.all().order_by('-uploaded_at')
     serializer_class = FileSerializer
-    permission_classes = [permissions.IsAuthenticated, IsAdminManagerOrTaskUser]
+    permission_classes = [PolicyPermission]
+    access_policy = FilePolicy()
+    # task_title comes from the task row
+    last_modified_related = ['task']
+    pagination_class = FileKeysetPagination
+    # Replacing the content stores and releases blobs
+    query_budget = {'destroy': 15, 'update': 16, 'partial_update': 16}
 
     def perform_create(self, serializer):
-        serializer.save(uploaded_by=self.request.user)
+        self.save_with_blob(serializer, uploaded_by=self.request.user)
+
+    def perform_update(self, serializer):
+        if 'file' not in serializer.validated_data:
+            serializer.save()
+            return
+        previous = serializer.instance.blob_id
+        with transaction.atomic():
+            self.save_with_blob(serializer)
+            blobs.release([previous])
+
+    def save_with_blob(self, serializer, **kwargs):
+        # The upload's bytes go to the blob store, deduplicated, instead of
+        # being written out again by the FileField; its metadata is saved
+        # in the same INSERT or UPDATE
+        upload = serializer.validated_data['file']
+        fields = metadata.extract(upload)
+        blob = blobs.store(upload)
+        try:
+            serializer.save(blob=blob, file=blob.file.name, checksum=blob.checksum, **fields, **kwargs)
+        except Exception:
+            blobs.release([blob.pk])
+            raise
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role in ['admin', 'manager']:
-            return File.objects.all()
-        # User can see files on tasks they are assigned to or own
-        return File.objects.filter(
-            models.Q(uploaded_by=user) |
-            models.Q(task__assigned_to=user) |
-            models.Q(task__project__owner=user)
-        ).distinct()
+        return self.access_policy.filter_queryset(File.objects.all(), self.request.user)
+
+    @action(detail=True, methods=['get'], content_negotiation_class=DownloadContentNegotiation)
+    def download(self, request, pk=None):
+        return downloads.serve_file(request, self.get_object())
+
+    @action(detail=True, methods=['get'], content_negotiation_class=DownloadContentNegotiation)
+    def thumbnail(self, request, pk=None):
+        return self.serve_preview(request, 'thumbnail')
+
+    @action(detail=True, methods=['get'], content_negotiation_class=DownloadContentNegotiation)
+    def preview(self, request, pk=None):
+        return self.serve_preview(request, 'preview')
+
+    def serve_preview(self, request, kind):
+        file = self.get_object()
+        stored = getattr(file.blob, kind) if file.blob else None
+        if not stored:
+            raise NotFound(f'This file has no {kind}.')
+        # Renders are derived from the content alone, so the checksum names them for good
+        name = f'{file.file_name.rsplit(".", 1)[0]}.{kind}.jpg'
+        return downloads.serve(
+            request, stored, 'image/jpeg', name,
+            etag=quote_etag(f'{file.blob.checksum}-{kind}'),
+            last_modified=int(file.blob.created_at.timestamp()),
+            as_attachment=False,
+        )
+
+
+class FileUploadViewSet(QueryBudgetMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                        mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Chunked, resumable uploads: create an upload, PUT its parts as raw
+    bytes to parts/<n>/ in any order, then POST complete/ to assemble
+    them into a File. After an interruption, GET the upload to see which
+    parts arrived and send only the missing ones. Parts are streamed to
+    storage as they are read, so no part is ever held in memory.
+    """
+    serializer_class = FileUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = {'complete': 20}
+
+    def get_queryset(self):
+        # Uploads are private to whoever started them
+        return FileUpload.objects.filter(uploaded_by=self.request.user).prefetch_related('parts')
+
+    def perform_create(self, serializer):
+        serializer.save(uploaded_by=self.request.user)
+
+    def perform_destroy(self, instance):
+        uploads.discard(instance)
+
+    @action(detail=True, methods=['put'], url_path=r'parts/(?P<part_number>\d+)')
+    def part(self, request, pk=None, part_number=None):
+        upload = self.get_object()
+        part_number = int(part_number)
+        if not 1 <= part_number <= settings.FILE_UPLOAD_MAX_PARTS:
+            raise ValidationError({'part_number': f'Must be between 1 and {settings.FILE_UPLOAD_MAX_PARTS}.'})
+        try:
+            size = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            size = 0
+        if size <= 0:
+            return Response({'detail': 'Send the part as a request body with a Content-Length.'},
+                            status=status.HTTP_411_LENGTH_REQUIRED)
+        if size > settings.FILE_UPLOAD_MAX_PART_SIZE:
+            return Response({'detail': f'Parts may be at most {settings.FILE_UPLOAD_MAX_PART_SIZE} bytes.'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        # Read the raw body stream; touching request.data would buffer it
+        part = uploads.save_part(upload, part_number, request.stream, size)
+        return Response(FileUploadPartSerializer(part).data)
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        upload = self.get_object()
+        parts = list(upload.parts.all())
+        numbers = [part.part_number for part in parts]
+        if not parts or numbers != list(range(1, len(parts) + 1)):
+            missing = sorted(set(range(1, max(numbers, default=0) + 1)) - set(numbers)) or [1]
+            raise ValidationError({'parts': f'Missing parts: {", ".join(map(str, missing))}.'})
+        size = sum(part.size for part in parts)
+        if upload.file_size is not None and size != upload.file_size:
+            raise ValidationError({'file_size': f'Expected {upload.file_size} bytes but the parts add up to {size}.'})
+        file = uploads.complete(upload, parts, checksum=request.data.get('checksum'))
+        return Response(FileSerializer(file, context=self.get_serializer_context()).data,
+                        status=status.HTTP_201_CREATED)
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from core import events, search
+        from .models import Project, Task
+        from .permissions import ProjectPolicy, TaskPolicy
+        from .serializers import TaskSerializer
+
+        search.register('project', Project, title='name', body='description', policy=ProjectPolicy())
+        search.register('task', Task, title='title', body='description', policy=TaskPolicy())
+        events.register('task', Task, TaskSerializer, policy=TaskPolicy())
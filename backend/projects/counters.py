@@ -0,0 +1,85 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Project, Task
+
+STATUS_COUNTERS = {
+    'todo': 'todo_count',
+    'in_progress': 'in_progress_count',
+    'done': 'done_count',
+}
+COUNTER_FIELDS = ['task_count', *STATUS_COUNTERS.values(), 'overdue_count']
+
+
+def is_overdue(status, due_date, now):
+    return bool(status) and status != 'done' and due_date is not None and due_date < now
+
+
+def counter_deltas(status, due_date, now, sign):
+    deltas = Counter({'task_count': sign})
+    if status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[status]] += sign
+    if is_overdue(status, due_date, now):
+        deltas['overdue_count'] += sign
+    return deltas
+
+
+def apply_changes(changes):
+    """
+    Move the project counters by the TaskChanges in ``changes``: the old
+    state is subtracted from the old project and the new state added to the
+    new one. Each affected project gets one UPDATE with F() increments, so
+    concurrent writers can't overwrite each other's counts.
+    """
+    now = timezone.now()
+    deltas = defaultdict(Counter)
+    for change in changes:
+        if change.old_project_id:
+            deltas[change.old_project_id].update(
+                counter_deltas(change.old_status, change.old_due_date, now, -1)
+            )
+        if change.new_project_id:
+            deltas[change.new_project_id].update(
+                counter_deltas(change.new_status, change.new_due_date, now, 1)
+            )
+
+    for project_id, counts in deltas.items():
+        updates = {field: F(field) + delta for field, delta in counts.items() if delta}
+        if updates:
+            # Counters are part of the serialized project, so they bump
+            # updated_at like any other change (ETags and delta sync rely on it)
+            Project.objects.filter(pk=project_id).update(updated_at=now, **updates)
+
+
+def recount(projects=None, overdue_only=False):
+    """
+    Recompute the counters from the tasks table with one GROUP BY and one
+    bulk update. Returns the number of projects whose counters changed.
+    """
+    now = timezone.now()
+    projects = Project.objects.all() if projects is None else projects
+    fields = ['overdue_count'] if overdue_only else COUNTER_FIELDS
+
+    annotations = {'overdue_count': Count('id', filter=Q(due_date__lt=now) & ~Q(status='done'))}
+    if not overdue_only:
+        annotations['task_count'] = Count('id')
+        for status, field in STATUS_COUNTERS.items():
+            annotations[field] = Count('id', filter=Q(status=status))
+    actual = {
+        row.pop('project_id'): row
+        for row in Task.objects.filter(project__in=projects).order_by()
+        .values('project_id').annotate(**annotations)
+    }
+
+    changed = []
+    for project in projects.only('id', *fields):
+        counts = actual.get(project.pk, {})
+        if any(getattr(project, field) != counts.get(field, 0) for field in fields):
+            for field in fields:
+                setattr(project, field, counts.get(field, 0))
+            project.updated_at = now
+            changed.append(project)
+    Project.objects.bulk_update(changed, fields + ['updated_at'], batch_size=1000)
+    return len(changed)
@@ -0,0 +1,110 @@
+from datetime import datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from .models import Task
+
+
+def parse_datetime_param(value, name, end_of_day=False):
+    """
+    Parse an ISO date or datetime query param into an aware datetime.
+    A bare date means the start of that day, or its end with ``end_of_day``.
+    """
+    # Dates first: parse_datetime also accepts a bare date, as midnight
+    try:
+        day = parse_date(value)
+        parsed = parse_datetime(value) if day is None else None
+    except ValueError:
+        day = parsed = None
+    if day is not None:
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    elif parsed is None:
+        raise ValidationError({name: 'Must be an ISO 8601 date or datetime.'})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    Query-param filters for the task list.
+
+    ?status=todo,in_progress       one or more statuses
+    ?assigned_to=<id>|me|none      assignee
+    ?project=<id>                  project
+    ?due_after=&due_before=        inclusive due-date range (date or datetime)
+    ?overdue=true|false            past due and not done
+
+    Each filter lines up with one of the Task indexes: (project, status),
+    (assigned_to, status, due_date) and (due_date).
+    """
+    true_values = ('1', 'true', 'yes')
+    false_values = ('0', 'false', 'no')
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        filters = {}
+
+        if params.get('status'):
+            statuses = [value.strip() for value in params['status'].split(',') if value.strip()]
+            valid = {choice for choice, _ in Task.STATUS_CHOICES}
+            invalid = set(statuses) - valid
+            if invalid:
+                raise ValidationError({'status': f"Unknown status(es): {', '.join(sorted(invalid))}"})
+            filters['status__in'] = statuses
+
+        if params.get('assigned_to'):
+            assignee = params['assigned_to']
+            if assignee == 'me':
+                filters['assigned_to'] = request.user.pk
+            elif assignee == 'none':
+                filters['assigned_to__isnull'] = True
+            else:
+                filters['assigned_to'] = self.parse_id(assignee, 'assigned_to')
+
+        if params.get('project'):
+            filters['project'] = self.parse_id(params['project'], 'project')
+
+        if params.get('due_after'):
+            filters['due_date__gte'] = parse_datetime_param(params['due_after'], 'due_after')
+        if params.get('due_before'):
+            filters['due_date__lte'] = parse_datetime_param(params['due_before'], 'due_before', end_of_day=True)
+
+        queryset = queryset.filter(**filters)
+
+        overdue = params.get('overdue', '').lower()
+        is_overdue = Q(due_date__lt=timezone.now()) & ~Q(status='done')
+        if overdue in self.true_values:
+            queryset = queryset.filter(is_overdue)
+        elif overdue in self.false_values:
+            queryset = queryset.exclude(is_overdue)
+        elif overdue:
+            raise ValidationError({'overdue': 'Must be true or false.'})
+
+        return queryset
+
+    def parse_id(self, value, name):
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: 'Must be an integer id.'})
+
+
+class TaskOrderingFilter(OrderingFilter):
+    """
+    ?ordering=due_date,-created_at on the plain list.
+
+    Keyset pages are always newest first, so asking for both is rejected
+    rather than silently ignoring one of them.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = request.query_params.get(self.ordering_param)
+        is_requested = getattr(getattr(view, 'paginator', None), 'is_requested', None)
+        if ordering and is_requested and is_requested(request):
+            raise ValidationError({self.ordering_param: 'Ordering cannot be combined with cursor pagination.'})
+        return super().filter_queryset(request, queryset, view)
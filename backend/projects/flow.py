@@ -0,0 +1,201 @@
+from collections import Counter, namedtuple
+from datetime import timedelta
+from functools import partial
+
+from django.db import connection
+from django.db.models import Min, Sum
+from django.utils import timezone
+
+from .models import ProjectCycleTimeDaily, ProjectFlowDaily, Task, TaskStatusChange
+
+FLOW_KEY, FLOW_COUNTS = ['project_id', 'day', 'status'], ['entered', 'exited']
+CYCLE_TIME_KEY, CYCLE_TIME_COUNTS = ['project_id', 'day', 'cycle_days'], ['count']
+
+# One task write as seen by the flow log and the project counters. Creations
+# have no old_* values and deletions no new_* values.
+TaskChange = namedtuple('TaskChange', [
+    'task_id',
+    'old_project_id', 'old_status', 'old_due_date',
+    'new_project_id', 'new_status', 'new_due_date',
+    'created_at',
+])
+
+
+def snapshot(task):
+    """The fields of ``task`` a TaskChange tracks; take one before modifying it."""
+    return task.project_id, task.status, task.due_date
+
+
+def created(task):
+    return TaskChange(task.pk, None, None, None, *snapshot(task), task.created_at)
+
+
+def updated(task, before):
+    return TaskChange(task.pk, *before, *snapshot(task), task.created_at)
+
+
+def deleted(task):
+    return TaskChange(task.pk, *snapshot(task), None, None, None, task.created_at)
+
+
+def transitions_for(change, user_id, at):
+    """
+    Log rows for one change. A task moved to another project leaves the old
+    one (status -> null) and arrives in the new one (null -> status), so
+    every row only ever touches the counts of its own project.
+    """
+    row = partial(TaskStatusChange, task_id=change.task_id, changed_by_id=user_id, changed_at=at)
+    if change.old_project_id == change.new_project_id:
+        if change.old_status == change.new_status:
+            return []
+        return [row(project_id=change.new_project_id, from_status=change.old_status, to_status=change.new_status)]
+    rows = []
+    if change.old_project_id:
+        rows.append(row(project_id=change.old_project_id, from_status=change.old_status, to_status=None))
+    if change.new_project_id:
+        rows.append(row(project_id=change.new_project_id, from_status=None, to_status=change.new_status))
+    return rows
+
+
+def flow_rows(transitions, day_of):
+    """Fold log rows into (project_id, day, status, entered, exited) rollup rows."""
+    counts = Counter()
+    for transition in transitions:
+        day = day_of(transition)
+        if transition.from_status:
+            counts[(transition.project_id, day, transition.from_status, 'exited')] += 1
+        if transition.to_status:
+            counts[(transition.project_id, day, transition.to_status, 'entered')] += 1
+    return [
+        (project_id, day, status, count if kind == 'entered' else 0, count if kind == 'exited' else 0)
+        for (project_id, day, status, kind), count in counts.items()
+    ]
+
+
+def record_changes(changes, user=None, at=None):
+    """
+    Append status transitions for ``changes`` and fold them into the daily
+    rollups. Runs a fixed number of queries however many tasks changed:
+    one insert for the log, one upsert per rollup table and, when tasks
+    were finished, one lookup of when they were started.
+    """
+    at = at or timezone.now()
+    day = connection.ops.adapt_datefield_value(timezone.localdate(at))
+    user_id = getattr(user, 'pk', None)
+
+    transitions = [row for change in changes for row in transitions_for(change, user_id, at)]
+    if not transitions:
+        return
+    TaskStatusChange.objects.bulk_create(transitions)
+    upsert_counts(ProjectFlowDaily, FLOW_KEY, FLOW_COUNTS, flow_rows(transitions, lambda transition: day))
+
+    finished = [
+        change for change in changes
+        if change.new_status == 'done' and change.old_status != 'done'
+    ]
+    if finished:
+        started = dict(
+            TaskStatusChange.objects
+            .filter(task_id__in=[change.task_id for change in finished], to_status='in_progress')
+            .values('task_id')
+            .annotate(started_at=Min('changed_at'))
+            .values_list('task_id', 'started_at')
+        )
+        cycle_times = Counter()
+        for change in finished:
+            # Tasks that skipped in_progress count from creation
+            started_at = started.get(change.task_id) or change.created_at or at
+            cycle_times[(change.new_project_id, day, cycle_days(started_at, at))] += 1
+        upsert_counts(ProjectCycleTimeDaily, CYCLE_TIME_KEY, CYCLE_TIME_COUNTS, [
+            (*key, count) for key, count in cycle_times.items()
+        ])
+
+
+def cycle_days(started_at, finished_at):
+    return max((finished_at - started_at).days, 0)
+
+
+def upsert_counts(model, key_columns, count_columns, rows):
+    """
+    Add ``rows`` to the counters of ``model`` in a single
+    INSERT ... ON CONFLICT DO UPDATE, which SQLite and PostgreSQL both
+    support. Increments happen in the database, so concurrent writers
+    never lose each other's counts.
+    """
+    if not rows:
+        return
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = [connection.ops.quote_name(column) for column in key_columns + count_columns]
+    placeholders = ', '.join(['(' + ', '.join(['%s'] * len(columns)) + ')'] * len(rows))
+    updates = ', '.join(
+        f'{column} = {table}.{column} + excluded.{column}'
+        for column in columns[len(key_columns):]
+    )
+    sql = (
+        f'INSERT INTO {table} ({", ".join(columns)}) VALUES {placeholders} '
+        f'ON CONFLICT ({", ".join(columns[:len(key_columns)])}) DO UPDATE SET {updates}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [value for row in rows for value in row])
+
+
+def cumulative_flow(project, start, end):
+    """
+    Tasks per status at the end of every day from ``start`` to ``end``, and
+    how many reached done each day. Reads one aggregate over the days before
+    the range plus the rollup rows inside it, so the cost grows with the
+    number of days, not transitions.
+    """
+    totals = Counter()
+    opening = (
+        ProjectFlowDaily.objects.filter(project=project, day__lt=start)
+        .values('status')
+        .annotate(entered=Sum('entered'), exited=Sum('exited'))
+    )
+    for row in opening:
+        totals[row['status']] += row['entered'] - row['exited']
+
+    by_day = {}
+    rows = ProjectFlowDaily.objects.filter(project=project, day__gte=start, day__lte=end)
+    for row in rows.values('day', 'status', 'entered', 'exited'):
+        by_day.setdefault(row['day'], []).append(row)
+
+    statuses = [key for key, _ in Task.STATUS_CHOICES]
+    flow, throughput = [], []
+    day = start
+    while day <= end:
+        finished = 0
+        for row in by_day.get(day, []):
+            totals[row['status']] += row['entered'] - row['exited']
+            if row['status'] == 'done':
+                finished += row['entered']
+        flow.append({'day': day, **{status: totals[status] for status in statuses}})
+        throughput.append({'day': day, 'done': finished})
+        day += timedelta(days=1)
+    return flow, throughput
+
+
+def cycle_time_percentiles(project, start, end, percentiles=(50, 85, 95)):
+    """Cycle time percentiles, in days, of tasks finished between ``start`` and ``end``."""
+    histogram = (
+        ProjectCycleTimeDaily.objects.filter(project=project, day__gte=start, day__lte=end)
+        .values('cycle_days')
+        .annotate(count=Sum('count'))
+        .order_by('cycle_days')
+    )
+    histogram = [(row['cycle_days'], row['count']) for row in histogram]
+    total = sum(count for _, count in histogram)
+    result = {'count': total}
+    for percentile in percentiles:
+        result[f'p{percentile}'] = None
+        if not total:
+            continue
+        # Nearest-rank percentile over the histogram
+        rank = max(1, -(-percentile * total // 100))
+        seen = 0
+        for cycle_days, count in histogram:
+            seen += count
+            if seen >= rank:
+                result[f'p{percentile}'] = cycle_days
+                break
+    return result
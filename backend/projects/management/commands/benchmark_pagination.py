@@ -0,0 +1,77 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.pagination import KeysetPagination
+from projects.models import Project, Task
+
+BENCHMARK_PROJECT = '__pagination_benchmark__'
+
+
+class Command(BaseCommand):
+    help = 'Compare OFFSET and keyset pagination latency at increasing depths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000, help='Number of tasks to benchmark against')
+        parser.add_argument('--page-size', type=int, default=50, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (median is reported)')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated tasks afterwards')
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        repeat = options['repeat']
+        project = self.seed(options['tasks'])
+        total = Task.objects.count()
+
+        self.stdout.write(f'Benchmarking {total} tasks, page size {page_size}, median of {repeat} runs')
+        self.stdout.write(f'{"depth":>10} {"offset ms":>12} {"keyset ms":>12}')
+
+        factory = APIRequestFactory()
+        ordered = Task.objects.order_by('-created_at', '-id')
+        depths = sorted({0, total // 100, total // 10, total // 2, total * 9 // 10})
+        for depth in depths:
+            if depth >= total:
+                continue
+            offset_ms = self.measure(lambda: list(ordered[depth:depth + page_size]), repeat)
+
+            paginator = KeysetPagination()
+            params = {'page_size': page_size}
+            if depth:
+                params['cursor'] = paginator.make_cursor(ordered[depth - 1])
+            request = Request(factory.get('/api/projects/tasks/', params))
+
+            def keyset_page():
+                return KeysetPagination().paginate_queryset(Task.objects.all(), request)
+
+            keyset_ms = self.measure(keyset_page, repeat)
+            self.stdout.write(f'{depth:>10} {offset_ms:>12.2f} {keyset_ms:>12.2f}')
+
+        if not options['keep']:
+            self.stdout.write('Removing benchmark data...')
+            project.delete()
+
+    def seed(self, count):
+        project, _ = Project.objects.get_or_create(name=BENCHMARK_PROJECT)
+        existing = project.tasks.count()
+        batch_size = 10_000
+        if existing < count:
+            self.stdout.write(f'Creating {count - existing} benchmark tasks...')
+        for start in range(existing, count, batch_size):
+            with transaction.atomic():
+                Task.objects.bulk_create(
+                    Task(title=f'Benchmark task {i}', project=project, status='todo')
+                    for i in range(start, min(start + batch_size, count))
+                )
+        return project
+
+    def measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,81 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from projects import flow
+from projects.models import Project, ProjectCycleTimeDaily, ProjectFlowDaily, Task, TaskStatusChange
+
+
+class Command(BaseCommand):
+    help = 'Backfill task status history and rebuild the daily flow and cycle time rollups from it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per query')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            seeded = self.seed_history(batch_size)
+            self.stdout.write(f'Seeded history for {seeded} tasks without any')
+            replayed = self.rebuild_rollups(batch_size)
+            self.stdout.write(f'Rebuilt rollups from {replayed} status changes')
+
+    def seed_history(self, batch_size):
+        # Tasks from before the log existed get a creation row at created_at
+        missing = Task.objects.exclude(
+            id__in=TaskStatusChange.objects.values('task_id')
+        ).values_list('id', 'project_id', 'status', 'created_at')
+        rows = [
+            TaskStatusChange(
+                task_id=task_id, project_id=project_id,
+                from_status=None, to_status=status, changed_at=created_at,
+            )
+            for task_id, project_id, status, created_at in missing.iterator()
+        ]
+        TaskStatusChange.objects.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
+
+    def rebuild_rollups(self, batch_size):
+        ProjectFlowDaily.objects.all().delete()
+        ProjectCycleTimeDaily.objects.all().delete()
+
+        def day_of(transition):
+            return connection.ops.adapt_datefield_value(timezone.localdate(transition.changed_at))
+
+        first_seen, started, cycle_times = {}, {}, Counter()
+        batch, replayed = [], 0
+        # History of deleted projects is kept in the log but has no rollup rows to go into
+        transitions = TaskStatusChange.objects.filter(project_id__in=Project.objects.values('id'))
+        for transition in transitions.order_by('changed_at', 'id').iterator(chunk_size=batch_size):
+            task_id = transition.task_id
+            is_new = task_id not in first_seen
+            first_seen.setdefault(task_id, transition.changed_at)
+            if transition.to_status == 'in_progress':
+                started.setdefault(task_id, transition.changed_at)
+            # Arriving in a project as done is a finish only for a brand new task, not a move
+            if transition.to_status == 'done' and transition.from_status != 'done' and (transition.from_status or is_new):
+                started_at = started.get(task_id, first_seen[task_id])
+                cycle_times[(
+                    transition.project_id, day_of(transition),
+                    flow.cycle_days(started_at, transition.changed_at),
+                )] += 1
+
+            batch.append(transition)
+            replayed += 1
+            if len(batch) >= batch_size:
+                self.write_flow(batch, day_of)
+                batch = []
+        self.write_flow(batch, day_of)
+
+        cycle_rows = [(*key, count) for key, count in cycle_times.items()]
+        for start in range(0, len(cycle_rows), batch_size):
+            flow.upsert_counts(
+                ProjectCycleTimeDaily, flow.CYCLE_TIME_KEY, flow.CYCLE_TIME_COUNTS,
+                cycle_rows[start:start + batch_size],
+            )
+        return replayed
+
+    def write_flow(self, transitions, day_of):
+        flow.upsert_counts(ProjectFlowDaily, flow.FLOW_KEY, flow.FLOW_COUNTS, flow.flow_rows(transitions, day_of))
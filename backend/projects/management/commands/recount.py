@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from projects.counters import recount
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized per-project task counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, action='append', dest='projects', help='Only this project id (repeatable)')
+        parser.add_argument(
+            '--overdue', action='store_true',
+            help='Only refresh overdue counts; schedule this to pick up tasks whose due date has passed',
+        )
+
+    def handle(self, *args, **options):
+        projects = Project.objects.all()
+        if options['projects']:
+            projects = projects.filter(pk__in=options['projects'])
+        changed = recount(projects, overdue_only=options['overdue'])
+        self.stdout.write(f'Updated counters on {changed} of {projects.count()} projects')
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:58
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def populate_counters(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+    rows = Task.objects.order_by().values('project_id').annotate(
+        task_count=Count('id'),
+        todo_count=Count('id', filter=Q(status='todo')),
+        in_progress_count=Count('id', filter=Q(status='in_progress')),
+        done_count=Count('id', filter=Q(status='done')),
+        overdue_count=Count('id', filter=Q(due_date__lt=timezone.now()) & ~Q(status='done')),
+    )
+    for row in rows:
+        Project.objects.filter(pk=row.pop('project_id')).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_task_status_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='done_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_progress_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='overdue_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='todo_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
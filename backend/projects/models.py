@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from accounts.models import User
 
 class Project(models.Model):
@@ -9,6 +10,24 @@ class Project(models.Model):
     end_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized task counters, kept current by projects.counters and
+    # repaired by the recount command. overdue_count only changes on task
+    # writes, so run ``recount --overdue`` periodically to catch tasks whose
+    # due date has simply passed.
+    task_count = models.IntegerField(default=0)
+    todo_count = models.IntegerField(default=0)
+    in_progress_count = models.IntegerField(default=0)
+    done_count = models.IntegerField(default=0)
+    overdue_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='project_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='project_updated_id_idx'),
+            # Either bound of a timeline overlap query can be the selective one
+            models.Index(fields=['start_date', 'end_date'], name='project_start_end_idx'),
+            models.Index(fields=['end_date', 'start_date'], name='project_end_start_idx'),
+        ]
 
 class Task(models.Model):
     STATUS_CHOICES = (
@@ -18,9 +37,71 @@ class Task(models.Model):
     )
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='tasks')
-    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='tasks')
+    # Indexed through the composite indexes below, which both lead with these columns
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='tasks', db_index=False)
+    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='tasks', db_index=False)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES)
     due_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='task_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='task_updated_id_idx'),
+            models.Index(fields=['project', 'status'], name='task_project_status_idx'),
+            models.Index(fields=['assigned_to', 'status', 'due_date'], name='task_assignee_status_due_idx'),
+            models.Index(fields=['due_date'], name='task_due_date_idx'),
+        ]
+
+
+class TaskStatusChange(models.Model):
+    """
+    Append-only log of task status changes, written by TaskViewSet.
+
+    ``from_status`` is null when the task was created in or moved into the
+    project and ``to_status`` is null when it was deleted or moved out.
+    Task and project are plain references without a database constraint so
+    the history outlives the rows it describes.
+    """
+    task = models.ForeignKey(Task, on_delete=models.DO_NOTHING, db_constraint=False, related_name='status_changes')
+    project = models.ForeignKey(Project, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    from_status = models.CharField(max_length=50, null=True, blank=True)
+    to_status = models.CharField(max_length=50, null=True, blank=True)
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'changed_at'], name='status_change_task_idx'),
+            models.Index(fields=['project', 'changed_at'], name='status_change_project_idx'),
+        ]
+
+
+class ProjectFlowDaily(models.Model):
+    """
+    Tasks entering and leaving each status per project and day.
+
+    The running sum of ``entered - exited`` up to a day is the number of
+    tasks in that status at the end of it, i.e. one band of a cumulative
+    flow diagram.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='flow_days')
+    day = models.DateField()
+    status = models.CharField(max_length=50)
+    entered = models.IntegerField(default=0)
+    exited = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['project', 'day', 'status']
+
+
+class ProjectCycleTimeDaily(models.Model):
+    """Histogram of cycle times, in whole days, for tasks finished per project and day."""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='cycle_time_days')
+    day = models.DateField()
+    cycle_days = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['project', 'day', 'cycle_days']
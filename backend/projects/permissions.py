@@ -0,0 +1,60 @@
+from django.db.models import Q
+from core.permissions import AccessPolicy
+from .models import Project, Task
+
+
+class ProjectPolicy(AccessPolicy):
+    model = Project
+
+    def get_scope(self, user):
+        if user.role in ['admin', 'manager']:
+            return None
+        return Q(owner=user)
+
+    def check_loaded(self, user, obj):
+        return obj.owner_id == user.id
+
+    def get_tombstone_scope(self, user):
+        if user.role in ['admin', 'manager']:
+            return None
+        return Q(scope_id=user.id)
+
+
+class TaskPolicy(AccessPolicy):
+    model = Task
+
+    def get_scope(self, user):
+        if user.role == 'admin':
+            return None
+        if user.role == 'manager':
+            # Managers can only see tasks assigned to their team members
+            return Q(assigned_to__manager_visibility__manager=user)
+        return Q(assigned_to=user)
+
+    def check_loaded(self, user, obj):
+        if user.role == 'manager':
+            return obj.assigned_to_id in user.get_visible_user_ids()
+        return obj.assigned_to_id is not None and obj.assigned_to_id == user.id
+
+    def get_tombstone_scope(self, user):
+        if user.role == 'admin':
+            return None
+        if user.role == 'manager':
+            return Q(scope_id__in=user.get_visible_user_ids())
+        return Q(scope_id=user.id)
+
+    def event_scope(self, obj):
+        return {'assigned_to': obj.assigned_to_id}
+
+    def previous_event_scope(self, obj):
+        loaded = getattr(obj, '_loaded_scope_id', obj.assigned_to_id)
+        if loaded != obj.assigned_to_id:
+            return {'assigned_to': loaded}
+        return None
+
+    def allows_event(self, user, scope):
+        if user.role == 'admin':
+            return True
+        if user.role == 'manager':
+            return scope['assigned_to'] in user.get_visible_user_ids()
+        return scope['assigned_to'] is not None and scope['assigned_to'] == user.id
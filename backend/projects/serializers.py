@@ -1,8 +1,11 @@
 from rest_framework import serializers
+from rest_framework.utils.urls import replace_query_param
 from .models import Project, Task
 from accounts.models import User
+from core.serializers import BulkPrimaryKeyRelatedField, SparseFieldsetMixin
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    serializer_related_field = BulkPrimaryKeyRelatedField
     assigned_to_username = serializers.CharField(source='assigned_to.username', read_only=True)
     class Meta:
         model = Task
@@ -12,17 +15,69 @@ class TaskSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at']
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     owner_username = serializers.CharField(source='owner.username', read_only=True)
     class Meta:
         model = Project
         fields = [
             'id', 'name', 'description', 'owner', 'owner_username',
-            'start_date', 'end_date', 'created_at', 'updated_at'
+            'start_date', 'end_date', 'created_at', 'updated_at',
+            'task_count', 'todo_count', 'in_progress_count', 'done_count', 'overdue_count',
+        ]
+        read_only_fields = [
+            'created_at', 'updated_at',
+            'task_count', 'todo_count', 'in_progress_count', 'done_count', 'overdue_count',
         ]
-        read_only_fields = ['created_at', 'updated_at']
 
 class ProjectDetailSerializer(ProjectSerializer):
-    tasks = TaskSerializer(many=True, read_only=True, source='tasks')
+    """
+    Project with one page of its tasks nested under ``tasks``.
+
+    The page, status filter and whether tasks are included at all come from
+    ``context['nested_tasks']``, which ``ProjectViewSet`` builds from the
+    query string alongside a matching ``nested_tasks`` prefetch.
+    """
+    tasks = serializers.SerializerMethodField()
     class Meta(ProjectSerializer.Meta):
-        fields = ProjectSerializer.Meta.fields + ['tasks'] 
\ No newline at end of file
+        fields = ProjectSerializer.Meta.fields + ['tasks']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.get_nested_task_options()['include']:
+            self.fields.pop('tasks', None)
+
+    def get_nested_task_options(self):
+        return self.context.get('nested_tasks') or {
+            'include': True, 'statuses': [], 'page': 1, 'page_size': 20,
+        }
+
+    def get_tasks(self, obj):
+        options = self.get_nested_task_options()
+        page, page_size = options['page'], options['page_size']
+
+        if hasattr(obj, 'nested_tasks'):
+            tasks, count = obj.nested_tasks, obj.nested_task_count
+        else:
+            queryset = obj.tasks.select_related('assigned_to').order_by('-created_at', '-id')
+            if options['statuses']:
+                queryset = queryset.filter(status__in=options['statuses'])
+            offset = (page - 1) * page_size
+            tasks, count = list(queryset[offset:offset + page_size]), queryset.count()
+
+        request = self.context.get('request')
+        next_link = previous_link = None
+        if request is not None:
+            url = request.build_absolute_uri()
+            if page * page_size < count:
+                next_link = replace_query_param(url, 'tasks_page', page + 1)
+            if page > 1:
+                previous_link = replace_query_param(url, 'tasks_page', page - 1)
+
+        return {
+            'count': count,
+            'next': next_link,
+            'previous': previous_link,
+            'results': TaskSerializer(tasks, many=True, context={
+                **self.context, 'sparse_fieldset_prefix': 'tasks',
+            }).data,
+        } 
\ No newline at end of file
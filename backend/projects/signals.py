@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core import cascades
+from core.models import Tombstone
+from .models import Project, Task
+
+# The column that decides who can see each row; changing it moves the row
+# out of some users' view, which delta sync reports like a deletion
+SCOPE_FIELDS = {
+    Project: 'owner_id',
+    Task: 'assigned_to_id',
+}
+
+cascades.track(Project, Task)
+
+
+@receiver(post_init, sender=Project)
+@receiver(post_init, sender=Task)
+def remember_scope(sender, instance, **kwargs):
+    # Read from __dict__ so deferred loads don't trigger a query
+    instance._loaded_scope_id = instance.__dict__.get(SCOPE_FIELDS[sender])
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Task)
+def record_scope_change(sender, instance, created, **kwargs):
+    scope_id = getattr(instance, SCOPE_FIELDS[sender])
+    if not created and scope_id != instance._loaded_scope_id:
+        Tombstone.record([(sender, instance.pk, instance._loaded_scope_id)])
+    instance._loaded_scope_id = scope_id
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+def record_deletion(sender, instance, origin=None, **kwargs):
+    # A project's tasks and the project itself go in one insert
+    row = (sender, instance.pk, getattr(instance, SCOPE_FIELDS[sender]))
+    cascades.defer(origin, instance, Tombstone.record, row)
@@ -1,8 +1,12 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import ProjectViewSet, TaskViewSet
+from .views import ProjectViewSet, TaskViewSet, ProjectStatsView, ProjectTimelineView
 
 router = DefaultRouter()
 router.register(r'projects', ProjectViewSet, basename='project')
 router.register(r'tasks', TaskViewSet, basename='task')
 
-urlpatterns = router.urls 
\ No newline at end of file
+urlpatterns = [
+    path('stats/', ProjectStatsView.as_view(), name='project-stats'),
+    path('timeline/', ProjectTimelineView.as_view(), name='project-timeline'),
+] + router.urls
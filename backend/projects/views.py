@@ -1,35 +1,163 @@
-from rest_framework import viewsets, permissions
-from rest_framework.exceptions import PermissionDenied
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import BooleanField, Case, Count, DateField, Max, Prefetch, Q, Value, When
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from core.mixins import ConditionalGetMixin, DeltaSyncMixin, EagerLoadingMixin, QueryBudgetMixin
+from core.models import Tombstone
+from core import events, search
+from core.permissions import PolicyPermission
+from . import counters, flow
+from .filters import TaskFilterBackend, TaskOrderingFilter, parse_datetime_param
 from .models import Project, Task
+from .permissions import ProjectPolicy, TaskPolicy
 from .serializers import ProjectSerializer, ProjectDetailSerializer, TaskSerializer
 from accounts.models import User
+from comments.models import Comment
+from comments.serializers import CommentSerializer
+from comments.views import TaskCommentPagination
+from files import archives
+from files.models import File
+from files.permissions import FilePolicy
+from files.views import DownloadContentNegotiation
+from timelogs import rollups as timelog_rollups
 
-class IsAdminManagerOrOwner(permissions.BasePermission):
-    def has_object_permission(self, request, view, obj):
-        user = request.user
-        if user.role == 'admin':
-            return True
-        if user.role == 'manager':
-            # Managers can only access their team members' tasks
-            if hasattr(obj, 'assigned_to') and obj.assigned_to:
-                return user.is_team_member(obj.assigned_to)
-            return True
-        if hasattr(obj, 'owner'):
-            return obj.owner == user
-        if hasattr(obj, 'assigned_to') and obj.assigned_to:
-            return obj.assigned_to == user
-        return False
-
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(QueryBudgetMixin, DeltaSyncMixin, ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all().order_by('-created_at')
     serializer_class = ProjectSerializer
-    permission_classes = [permissions.IsAuthenticated, IsAdminManagerOrOwner]
+    permission_classes = [PolicyPermission]
+    access_policy = ProjectPolicy()
+    nested_task_page_size = 20
+    flow_default_days = 30
+    flow_max_days = 731
+    max_nested_task_page_size = 100
+    # A delete cascades to tasks, comments, time logs and files; each kind
+    # costs a fixed number of queries however many rows it has
+    query_budget = {'destroy': 25}
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return ProjectDetailSerializer
         return ProjectSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'retrieve':
+            context['nested_tasks'] = self.get_nested_task_options()
+        return context
+
+    def get_nested_task_options(self):
+        """
+        Read the nested task options for the detail view:
+        ``?include=`` (comma separated, defaults to ``tasks``),
+        ``?tasks_status=`` (comma separated statuses), ``?tasks_page=``
+        and ``?tasks_page_size=``.
+        """
+        params = self.request.query_params
+        include = params.get('include')
+        statuses = params.get('tasks_status')
+
+        try:
+            page = max(int(params.get('tasks_page', 1)), 1)
+        except ValueError:
+            page = 1
+        try:
+            page_size = int(params.get('tasks_page_size', self.nested_task_page_size))
+        except ValueError:
+            page_size = self.nested_task_page_size
+        if page_size <= 0:
+            page_size = self.nested_task_page_size
+
+        return {
+            'include': include is None or 'tasks' in include.split(','),
+            'statuses': [s for s in statuses.split(',') if s] if statuses else [],
+            'page': page,
+            'page_size': min(page_size, self.max_nested_task_page_size),
+        }
+
+    def get_validator(self, queryset):
+        last_modified, count = super().get_validator(queryset)
+        if self.action != 'retrieve' or not count or 'tasks' not in self.get_serializer().fields:
+            return last_modified, count
+        # The nested tasks are part of the representation too
+        tasks = Task.objects.filter(project__in=queryset.values('pk')).aggregate(
+            last_modified=Max('updated_at'), count=Count('pk'),
+        )
+        if tasks['last_modified'] and tasks['last_modified'] > last_modified:
+            last_modified = tasks['last_modified']
+        return last_modified, count + tasks['count']
+
+    def with_nested_tasks(self, queryset):
+        # One query for the requested page of tasks and their assignees,
+        # with the total count annotated onto the project row
+        options = self.get_nested_task_options()
+        if not options['include'] or 'tasks' not in self.get_serializer().fields:
+            return queryset
+
+        tasks = Task.objects.select_related('assigned_to').order_by('-created_at', '-id')
+        count_filter = None
+        if options['statuses']:
+            tasks = tasks.filter(status__in=options['statuses'])
+            count_filter = Q(tasks__status__in=options['statuses'])
+
+        offset = (options['page'] - 1) * options['page_size']
+        return queryset.annotate(
+            nested_task_count=Count('tasks', filter=count_filter),
+        ).prefetch_related(Prefetch(
+            'tasks',
+            queryset=tasks[offset:offset + options['page_size']],
+            to_attr='nested_tasks',
+        ))
+
+    @action(detail=True, methods=['get'])
+    def flow(self, request, pk=None):
+        """
+        Cumulative flow, daily throughput and cycle time percentiles (in
+        days) from the status rollups. ``?from=`` and ``?to=`` are dates and
+        default to the last ``flow_default_days`` days.
+        """
+        project = self.get_object()
+        params = request.query_params
+        end = timezone.localdate()
+        if params.get('to'):
+            end = timezone.localdate(parse_datetime_param(params['to'], 'to'))
+        start = end - timedelta(days=self.flow_default_days - 1)
+        if params.get('from'):
+            start = timezone.localdate(parse_datetime_param(params['from'], 'from'))
+        if end < start:
+            raise ValidationError({'to': 'Must not be before from.'})
+        if (end - start).days >= self.flow_max_days:
+            raise ValidationError({'from': f'Range spans more than {self.flow_max_days} days.'})
+
+        cumulative, throughput = flow.cumulative_flow(project, start, end)
+        return Response({
+            'project': project.pk,
+            'from': start,
+            'to': end,
+            'cumulative_flow': cumulative,
+            'throughput': throughput,
+            'cycle_time': flow.cycle_time_percentiles(project, start, end),
+        })
+
+    @action(detail=True, methods=['get'], url_path=r'files\.zip', url_name='files-zip',
+            content_negotiation_class=DownloadContentNegotiation)
+    def files_zip(self, request, pk=None):
+        """Every file the user can see in the project as one ZIP, a folder per task, streamed as it is built."""
+        project = self.get_object()
+        files = FilePolicy().filter_queryset(File.objects.filter(task__project=project), request.user)
+        return archives.response(
+            request, files.order_by('task__title', 'task_id', 'file_name', 'pk'), project.name, folder_field='task__title',
+        )
+
     def perform_create(self, serializer):
         # Only admins can create projects
         if self.request.user.role != 'admin':
@@ -37,15 +165,21 @@ class ProjectViewSet(viewsets.ModelViewSet):
         serializer.save(owner=self.request.user)
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role in ['admin', 'manager']:
-            return Project.objects.all()
-        return Project.objects.filter(owner=user)
+        queryset = self.access_policy.filter_queryset(Project.objects.all(), self.request.user)
+        if getattr(self, 'action', None) == 'retrieve':
+            queryset = self.with_nested_tasks(queryset)
+        return queryset
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(QueryBudgetMixin, DeltaSyncMixin, ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all().order_by('-created_at')
     serializer_class = TaskSerializer
-    permission_classes = [permissions.IsAuthenticated, IsAdminManagerOrOwner]
+    permission_classes = [PolicyPermission]
+    access_policy = TaskPolicy()
+    filter_backends = [TaskFilterBackend, TaskOrderingFilter]
+    ordering_fields = ['due_date', 'status', 'title', 'created_at', 'updated_at', 'id']
+    bulk_max_items = 500
+    # Moving a task to another project also moves its logged hours
+    query_budget = {'bulk': 50, 'destroy': 25, 'update': 12, 'partial_update': 12}
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -76,15 +210,384 @@ class TaskViewSet(viewsets.ModelViewSet):
                     raise PermissionDenied(f"You can only assign tasks to your team members. {assigned_user.username} is not in your team.")
         
         # Save the task
-        task = serializer.save()
+        with transaction.atomic():
+            task = serializer.save()
+            self.record_changes([flow.created(task)])
         print(f"Task created: {task.title} assigned to {task.assigned_to}")
 
+    def perform_update(self, serializer):
+        before = flow.snapshot(serializer.instance)
+        with transaction.atomic():
+            task = serializer.save()
+            self.record_changes([flow.updated(task, before)])
+
+    def perform_destroy(self, instance):
+        change = flow.deleted(instance)
+        with transaction.atomic():
+            instance.delete()
+            self.record_changes([change])
+
     def get_queryset(self):
-        user = self.request.user
+        return self.access_policy.filter_queryset(Task.objects.all(), self.request.user)
+
+    def record_changes(self, changes):
+        """Log status transitions and move the project counters and hours; call inside the write's transaction."""
+        flow.record_changes(changes, self.request.user)
+        counters.apply_changes(changes)
+        timelog_rollups.move_tasks(changes)
+
+    @action(detail=True, methods=['get'])
+    def comments(self, request, pk=None):
+        """
+        Newest-first keyset pages of the task's comments (``?cursor=``,
+        ``?page_size=``, 50 by default).
+
+        Whoever can see a task can see every comment on it (CommentPolicy
+        admits assignees, project owners, managers and admins), so the page
+        is a plain range scan with no visibility subquery.
+        """
+        task = self.get_object()
+        paginator = TaskCommentPagination()
+        comments = paginator.paginate_queryset(
+            Comment.objects.filter(task=task).select_related('user'), request, view=self,
+        )
+        for comment in comments:
+            comment.task = task
+        serializer = CommentSerializer(comments, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path=r'files\.zip', url_name='files-zip',
+            content_negotiation_class=DownloadContentNegotiation)
+    def files_zip(self, request, pk=None):
+        """Every file the user can see on the task as one ZIP, streamed as it is built."""
+        task = self.get_object()
+        files = FilePolicy().filter_queryset(File.objects.filter(task=task), request.user)
+        return archives.response(request, files.order_by('file_name', 'pk'), task.title)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create, partially update and delete many tasks in one transaction.
+
+        The body is ``{"create": [task, ...], "update": [{"id": ..., field:
+        value}, ...], "delete": [id, ...]}``. Every referenced project, user
+        and task is loaded up front with one query per model, valid items
+        are written with bulk_create/bulk_update, and the response reports
+        a status for each item in the order it was sent.
+        """
+        creates = request.data.get('create', []) if isinstance(request.data, dict) else None
+        updates = request.data.get('update', []) if isinstance(request.data, dict) else None
+        deletes = request.data.get('delete', []) if isinstance(request.data, dict) else None
+        if not all(isinstance(items, list) for items in (creates, updates, deletes)):
+            return Response(
+                {'detail': 'Expected an object with "create", "update" and/or "delete" lists.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(creates) + len(updates) + len(deletes) > self.bulk_max_items:
+            return Response(
+                {'detail': f'A bulk request may contain at most {self.bulk_max_items} items.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user = request.user
+        update_ids = self.collect_ids([item.get('id') for item in updates if isinstance(item, dict)])
+        delete_ids = self.collect_ids(deletes)
+        items = [item for item in creates + updates if isinstance(item, dict)]
+        context = self.get_serializer_context()
+        context['bulk_related'] = {
+            Project: Project.objects.in_bulk(self.collect_ids(item.get('project') for item in items)),
+            User: User.objects.in_bulk(self.collect_ids(item.get('assigned_to') for item in items)),
+        }
+        tasks = self.access_policy.filter_queryset(
+            Task.objects.select_related('assigned_to'), user
+        ).in_bulk(update_ids)
+
+        create_results, new_tasks = [], []
+        for index, item in enumerate(creates):
+            serializer = TaskSerializer(data=item, context=context)
+            error = self.validate_bulk_item(serializer, user)
+            if error:
+                create_results.append({'index': index, **error})
+                continue
+            task = Task(**serializer.validated_data)
+            new_tasks.append(task)
+            create_results.append({'index': index, 'status': status.HTTP_201_CREATED, 'task': task})
+
+        update_results, changed_tasks, changed_fields, task_changes = [], [], set(), []
+        for index, item in enumerate(updates):
+            task_id = self.collect_ids([item.get('id')]) if isinstance(item, dict) else []
+            task = tasks.get(task_id[0]) if task_id else None
+            if task is None:
+                update_results.append({'index': index, 'status': status.HTTP_404_NOT_FOUND, 'errors': {'detail': 'Not found.'}})
+                continue
+            data = {key: value for key, value in item.items() if key != 'id'}
+            serializer = TaskSerializer(task, data=data, partial=True, context=context)
+            error = self.validate_bulk_item(serializer, user)
+            if error:
+                update_results.append({'index': index, **error})
+                continue
+            before = flow.snapshot(task)
+            for field, value in serializer.validated_data.items():
+                setattr(task, field, value)
+                changed_fields.add(field)
+            changed_tasks.append(task)
+            task_changes.append(flow.updated(task, before))
+            update_results.append({'index': index, 'status': status.HTTP_200_OK, 'task': task})
+
+        deletable = self.access_policy.filter_queryset(Task.objects.filter(id__in=delete_ids), user)
+        deletable_tasks = {
+            task.pk: task
+            for task in deletable.only('id', 'project_id', 'assigned_to_id', 'status', 'due_date', 'created_at')
+        }
+        deletable_ids = set(deletable_tasks)
+        delete_results = []
+        for index, task_id in enumerate(deletes):
+            task_id = self.collect_ids([task_id])
+            if task_id and task_id[0] in deletable_ids:
+                delete_results.append({'index': index, 'id': task_id[0], 'status': status.HTTP_204_NO_CONTENT})
+            else:
+                delete_results.append({'index': index, 'status': status.HTTP_404_NOT_FOUND, 'errors': {'detail': 'Not found.'}})
+
+        with transaction.atomic():
+            if new_tasks:
+                Task.objects.bulk_create(new_tasks)
+            if changed_tasks:
+                now = timezone.now()
+                for task in changed_tasks:
+                    task.updated_at = now
+                Task.objects.bulk_update(changed_tasks, sorted(changed_fields | {'updated_at'}))
+                # bulk_update sends no post_save, so record reassignments for delta sync here
+                Tombstone.record([
+                    (Task, task.pk, task._loaded_scope_id) for task in changed_tasks
+                    if task.assigned_to_id != task._loaded_scope_id
+                ])
+            # Neither bulk write sends post_save, so refresh the search index in one upsert
+            search.index_objects(Task, new_tasks + changed_tasks)
+            if deletable_ids:
+                Task.objects.filter(id__in=deletable_ids).delete()
+            self.record_changes(
+                [flow.created(task) for task in new_tasks] + task_changes +
+                [flow.deleted(task) for task in deletable_tasks.values()]
+            )
+            # The bulk writes send no per-row signals, so publish push events here
+            events.publish_objects(Task, 'created', new_tasks)
+            events.publish_objects(Task, 'updated', changed_tasks)
+            events.publish_objects(Task, 'deleted', deletable_tasks.values())
+
+        for result in create_results + update_results:
+            if 'task' in result:
+                task = result.pop('task')
+                result['id'] = task.id
+                result['data'] = TaskSerializer(task, context=self.get_serializer_context()).data
+        return Response({'create': create_results, 'update': update_results, 'delete': delete_results})
+
+    def collect_ids(self, values):
+        ids = []
+        for value in values:
+            try:
+                ids.append(int(value))
+            except (TypeError, ValueError):
+                continue
+        return ids
+
+    def validate_bulk_item(self, serializer, user):
+        if not serializer.is_valid():
+            return {'status': status.HTTP_400_BAD_REQUEST, 'errors': serializer.errors}
+        # Managers can only assign tasks to their team members
+        assigned_user = serializer.validated_data.get('assigned_to')
+        if user.role == 'manager' and assigned_user and not user.is_team_member(assigned_user):
+            return {
+                'status': status.HTTP_403_FORBIDDEN,
+                'errors': {'detail': f'You can only assign tasks to your team members. {assigned_user.username} is not in your team.'},
+            }
+        return None
+
+class ProjectStatsView(APIView):
+    """Dashboard counters computed in the database instead of the browser.
+
+    Task counts come from a single GROUP BY over the same queryset
+    ``TaskViewSet`` exposes to the user, and the result is cached per
+    visibility scope for ``PROJECT_STATS_CACHE_TIMEOUT`` seconds.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        cache_key = f'project_stats_{self.get_scope(request.user)}'
+        stats = cache.get(cache_key)
+        if stats is None:
+            stats = self.compute_stats(request)
+            cache.set(cache_key, stats, timeout=settings.PROJECT_STATS_CACHE_TIMEOUT)
+        return Response(stats)
+
+    def get_scope(self, user):
+        # Admins all see the same data, so they can share one cache entry
         if user.role == 'admin':
-            return Task.objects.all()
-        elif user.role == 'manager':
-            # Managers can only see tasks assigned to their team members
-            team_members = user.get_team_members()
-            return Task.objects.filter(assigned_to__in=team_members)
-        return Task.objects.filter(assigned_to=user)
\ No newline at end of file
+            return 'admin'
+        return f'{user.role}_{user.id}'
+
+    def compute_stats(self, request):
+        projects = ProjectViewSet(request=request).get_queryset()
+        tasks = TaskViewSet(request=request).get_queryset()
+        now = timezone.now()
+
+        rows = (
+            tasks.order_by()
+            .annotate(overdue=Case(
+                When(Q(due_date__lt=now) & ~Q(status='done'), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ))
+            .values(
+                'project_id', 'project__name', 'assigned_to_id',
+                'assigned_to__username', 'status', 'overdue',
+            )
+            .annotate(count=Count('id'))
+        )
+
+        by_status = {key: 0 for key, _ in Task.STATUS_CHOICES}
+        by_project = {}
+        by_assignee = {}
+        total = overdue = 0
+        for row in rows:
+            count = row['count']
+            total += count
+            by_status[row['status']] = by_status.get(row['status'], 0) + count
+            if row['overdue']:
+                overdue += count
+
+            project = by_project.setdefault(row['project_id'], {
+                'project': row['project_id'],
+                'project_name': row['project__name'],
+                'total': 0,
+                'overdue': 0,
+                **{key: 0 for key, _ in Task.STATUS_CHOICES},
+            })
+            assignee = by_assignee.setdefault(row['assigned_to_id'], {
+                'assigned_to': row['assigned_to_id'],
+                'assigned_to_username': row['assigned_to__username'],
+                'total': 0,
+                'overdue': 0,
+                **{key: 0 for key, _ in Task.STATUS_CHOICES},
+            })
+            for group in (project, assignee):
+                group['total'] += count
+                group[row['status']] = group.get(row['status'], 0) + count
+                if row['overdue']:
+                    group['overdue'] += count
+
+        return {
+            'projects': projects.count(),
+            'tasks': total,
+            'completed_tasks': by_status.get('done', 0),
+            'pending_tasks': total - by_status.get('done', 0),
+            'overdue_tasks': overdue,
+            'by_status': by_status,
+            'by_project': list(by_project.values()),
+            'by_assignee': list(by_assignee.values()),
+            'generated_at': now,
+        }
+
+
+class ProjectTimelineView(APIView):
+    """Projects and task due dates between ``from`` and ``to``, bucketed per week or month.
+
+    GET /api/projects/timeline/?from=2026-01-01&to=2026-06-30[&bucket=week|month]
+
+    A project is on the timeline when [start_date, end_date] overlaps the
+    range; a missing end_date means it is still running, and projects
+    without a start_date are unscheduled and left out. Tasks are counted
+    by the bucket their due_date falls in. Both the project interval and
+    the task due-date predicates are plain range filters over indexed
+    columns, and tasks come back pre-aggregated per (project, bucket,
+    status), so the payload stays small however many tasks there are.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    truncations = {'week': TruncWeek, 'month': TruncMonth}
+    max_buckets = 260
+
+    def get(self, request):
+        params = request.query_params
+        errors = {name: 'This parameter is required.' for name in ('from', 'to') if not params.get(name)}
+        if errors:
+            raise ValidationError(errors)
+        start = parse_datetime_param(params['from'], 'from')
+        end = parse_datetime_param(params['to'], 'to', end_of_day=True)
+        if end < start:
+            raise ValidationError({'to': 'Must not be before from.'})
+        bucket = params.get('bucket', 'week')
+        if bucket not in self.truncations:
+            raise ValidationError({'bucket': f"Must be one of: {', '.join(self.truncations)}."})
+
+        buckets = self.get_buckets(start, end, bucket)
+        if len(buckets) > self.max_buckets:
+            raise ValidationError({'bucket': f'Range spans more than {self.max_buckets} {bucket}s.'})
+
+        projects = list(
+            ProjectViewSet(request=request).get_queryset()
+            .filter(Q(start_date__lte=end) & (Q(end_date__gte=start) | Q(end_date__isnull=True)))
+            .order_by('start_date', 'id')
+            .values('id', 'name', 'owner_id', 'start_date', 'end_date')
+        )
+        task_rows = list(
+            TaskViewSet(request=request).get_queryset()
+            .filter(due_date__gte=start, due_date__lte=end)
+            .annotate(bucket=self.truncations[bucket]('due_date', output_field=DateField()))
+            .order_by()
+            .values('project_id', 'bucket', 'status')
+            .annotate(count=Count('id'))
+        )
+
+        return Response({
+            'from': start,
+            'to': end,
+            'bucket': bucket,
+            'buckets': self.summarize(buckets, bucket, projects, task_rows),
+            'projects': projects,
+            'tasks': sorted(task_rows, key=lambda row: (row['bucket'], row['project_id'], row['status'])),
+        })
+
+    def get_buckets(self, start, end, bucket):
+        """Return the first day of every week (Monday) or month touching the range, in local time."""
+        day = timezone.localtime(start).date()
+        last = timezone.localtime(end).date()
+        if bucket == 'week':
+            day -= timedelta(days=day.weekday())
+        else:
+            day = day.replace(day=1)
+
+        buckets = []
+        while day <= last and len(buckets) <= self.max_buckets:
+            buckets.append(day)
+            day = self.next_bucket(day, bucket)
+        return buckets
+
+    def next_bucket(self, day, bucket):
+        if bucket == 'week':
+            return day + timedelta(days=7)
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+    def summarize(self, buckets, bucket, projects, task_rows):
+        # Overlap counts per bucket come from two sorted arrays and bisection
+        # instead of a nested loop over projects and buckets
+        starts = sorted(timezone.localtime(p['start_date']).date() for p in projects)
+        ends = sorted(timezone.localtime(p['end_date']).date() for p in projects if p['end_date'])
+        due = {}
+        for row in task_rows:
+            counts = due.setdefault(row['bucket'], {key: 0 for key, _ in Task.STATUS_CHOICES})
+            counts[row['status']] = counts.get(row['status'], 0) + row['count']
+
+        summary = []
+        for bucket_start in buckets:
+            next_start = self.next_bucket(bucket_start, bucket)
+            started_before_end = bisect_left(starts, next_start)
+            ended_before_start = bisect_left(ends, bucket_start)
+            by_status = due.get(bucket_start, {key: 0 for key, _ in Task.STATUS_CHOICES})
+            summary.append({
+                'start': bucket_start,
+                'active_projects': started_before_end - ended_before_start,
+                'starting_projects': started_before_end - bisect_left(starts, bucket_start),
+                'ending_projects': bisect_left(ends, next_start) - ended_before_start,
+                'due_tasks': sum(by_status.values()),
+                'by_status': by_status,
+            })
+        return summary
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class TimelogsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'timelogs'
+
+    def ready(self):
+        from core import events
+        from . import signals  # noqa: F401
+        from .models import TimeLog
+        from .permissions import TimeLogPolicy
+        from .serializers import TimeLogSerializer
+
+        events.register('timelog', TimeLog, TimeLogSerializer, policy=TimeLogPolicy())
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from timelogs import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the daily time tracking rollups from the time logs; run after bulk changes '
+        'that bypass model signals, such as queryset updates or task moves outside the API'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rollups.rebuild()
+        self.stdout.write(f'Rebuilt {written} daily rollup rows')
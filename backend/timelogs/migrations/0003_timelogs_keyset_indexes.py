@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_projects_keyset_indexes'),
+        ('timelogs', '0002_alter_timelog_options_alter_timelog_unique_together'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timelog',
+            index=models.Index(fields=['created_at', 'id'], name='timelog_created_id_idx'),
+        ),
+    ]
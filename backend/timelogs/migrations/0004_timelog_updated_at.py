@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timelogs', '0003_timelogs_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timelog',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def populate_rollup(apps, schema_editor):
+    TimeLog = apps.get_model('timelogs', 'TimeLog')
+    TimeLogDaily = apps.get_model('timelogs', 'TimeLogDaily')
+    rows = (
+        TimeLog.objects.filter(user__isnull=False).annotate(day=TruncDate('created_at'))
+        .order_by().values('task__project_id', 'user_id', 'day')
+        .annotate(total_hours=Sum('hours'), total_entries=Count('id'))
+    )
+    TimeLogDaily.objects.bulk_create(
+        (
+            TimeLogDaily(project_id=row['task__project_id'], user_id=row['user_id'], day=row['day'],
+                         hours=row['total_hours'], entries=row['total_entries'])
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_project_task_counters'),
+        ('timelogs', '0004_timelog_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeLogDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('entries', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='projects.project')),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'day'], name='timelog_daily_user_idx'), models.Index(fields=['day'], name='timelog_daily_day_idx')],
+                'unique_together': {('project', 'user', 'day')},
+            },
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
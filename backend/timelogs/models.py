@@ -1,5 +1,5 @@
 from django.db import models
-from projects.models import Task
+from projects.models import Project, Task
 from accounts.models import User
 
 class TimeLog(models.Model):
@@ -8,11 +8,39 @@ class TimeLog(models.Model):
     hours = models.DecimalField(max_digits=5, decimal_places=2)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ['task', 'user']
         verbose_name = 'Time Log'
         verbose_name_plural = 'Time Logs'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='timelog_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.task.title} - {self.hours}h"
+
+
+class TimeLogDaily(models.Model):
+    """
+    Hours logged per project, user and day (the local date of each log's
+    created_at), maintained by timelogs.rollups as logs are written. Every
+    report dimension but the task reads from here.
+
+    Project and user are plain references without a database constraint:
+    deleted tasks have their logs subtracted, and rows of deleted projects
+    are dropped with them.
+    """
+    project = models.ForeignKey(Project, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    day = models.DateField()
+    hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    entries = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['project', 'user', 'day']
+        indexes = [
+            models.Index(fields=['user', 'day'], name='timelog_daily_user_idx'),
+            models.Index(fields=['day'], name='timelog_daily_day_idx'),
+        ]
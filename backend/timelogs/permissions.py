@@ -0,0 +1,23 @@
+from django.db.models import Q
+from core.permissions import AccessPolicy
+from .models import TimeLog
+
+
+class TimeLogPolicy(AccessPolicy):
+    model = TimeLog
+
+    def get_scope(self, user):
+        if user.role in ['admin', 'manager']:
+            return None
+        return Q(user=user)
+
+    def check_loaded(self, user, obj):
+        return obj.user_id == user.id
+
+    def event_scope(self, obj):
+        return {'user': obj.user_id}
+
+    def allows_event(self, user, scope):
+        if user.role in ['admin', 'manager']:
+            return True
+        return scope['user'] == user.id
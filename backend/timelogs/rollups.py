@@ -0,0 +1,135 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from projects.flow import upsert_counts
+from .models import TimeLog, TimeLogDaily
+
+ROLLUP_KEY, ROLLUP_COUNTS = ['project_id', 'user_id', 'day'], ['hours', 'entries']
+
+# Report dimension -> (id column, label column) on TimeLogDaily and on TimeLog
+DIMENSIONS = {
+    'user': (('user_id', 'user__username'), ('user_id', 'user__username')),
+    'team': (('user__team_id', 'user__team__name'), ('user__team_id', 'user__team__name')),
+    'project': (('project_id', 'project__name'), ('task__project_id', 'task__project__name')),
+    'task': (None, ('task_id', 'task__title')),
+}
+PERIODS = {
+    'day': (lambda: F('day'), lambda: TruncDate('created_at')),
+    'week': (lambda: TruncWeek('day'), lambda: TruncWeek('created_at', output_field=DateField())),
+    'month': (lambda: TruncMonth('day'), lambda: TruncMonth('created_at', output_field=DateField())),
+}
+
+
+def row(project_id, user_id, created_at, hours, sign):
+    """
+    The signed rollup row a log adds (sign 1) or takes away (sign -1), or
+    None for logs without a user, which no rollup row holds.
+    """
+    if project_id is None or user_id is None or hours is None:
+        return None
+    day = connection.ops.adapt_datefield_value(timezone.localdate(created_at))
+    return project_id, user_id, day, sign * Decimal(hours), sign
+
+
+def apply(rows):
+    """
+    Fold signed rows into TimeLogDaily with one upsert. Rows that cancel
+    out, such as an edit that only touched the description, cost no query.
+    """
+    totals = {}
+    for project_id, user_id, day, hours, entries in filter(None, rows):
+        key = (project_id, user_id, day)
+        previous_hours, previous_entries = totals.get(key, (0, 0))
+        totals[key] = (previous_hours + hours, previous_entries + entries)
+    upsert_counts(TimeLogDaily, ROLLUP_KEY, ROLLUP_COUNTS, [
+        (*key, hours, entries) for key, (hours, entries) in totals.items() if hours or entries
+    ])
+
+
+def move_tasks(changes):
+    """
+    Carry the hours logged on tasks that moved to another project over to
+    it. Takes projects.flow TaskChanges; call inside the write's transaction.
+    """
+    moves = {
+        change.task_id: (change.old_project_id, change.new_project_id)
+        for change in changes
+        if change.old_project_id and change.new_project_id and change.old_project_id != change.new_project_id
+    }
+    if not moves:
+        return
+    rows = []
+    logs = TimeLog.objects.filter(task_id__in=moves).values_list('task_id', 'user_id', 'created_at', 'hours')
+    for task_id, user_id, created_at, hours in logs:
+        old_project_id, new_project_id = moves[task_id]
+        rows.append(row(old_project_id, user_id, created_at, hours, -1))
+        rows.append(row(new_project_id, user_id, created_at, hours, 1))
+    apply(rows)
+
+
+def rebuild():
+    """Recompute TimeLogDaily from the logs. Returns the number of rows written."""
+    TimeLogDaily.objects.all().delete()
+    rows = (
+        TimeLog.objects.filter(user__isnull=False).annotate(log_day=TruncDate('created_at'))
+        .order_by().values_list('task__project_id', 'user_id', 'log_day')
+        .annotate(total_hours=Sum('hours'), total_entries=Count('id'))
+    )
+    daily = [
+        TimeLogDaily(project_id=project_id, user_id=user_id, day=day, hours=hours, entries=entries)
+        for project_id, user_id, day, hours, entries in rows.iterator()
+    ]
+    TimeLogDaily.objects.bulk_create(daily, batch_size=1000)
+    return len(daily)
+
+
+def report(group_by, period, start, end, scope=None, filters=None):
+    """
+    Hours and entry counts between the dates ``start`` and ``end``, grouped
+    by the ``group_by`` dimensions and, unless ``period`` is None, by the
+    day, week or month they were logged in. ``scope`` is a Q on ``user``
+    and ``filters`` maps dimensions to lists of ids.
+
+    Reads TimeLogDaily, so the cost follows the number of users, projects
+    and days in range rather than of logs. Grouping or filtering by task
+    reads TimeLog itself: it already holds one row per task and user.
+    """
+    filters = filters or {}
+    by_task = 'task' in group_by or 'task' in filters
+    source = 1 if by_task else 0
+    if by_task:
+        queryset = TimeLog.objects.filter(
+            user__isnull=False, created_at__date__gte=start, created_at__date__lte=end,
+        )
+    else:
+        queryset = TimeLogDaily.objects.filter(day__gte=start, day__lte=end)
+    if scope is not None:
+        queryset = queryset.filter(scope)
+    for dimension, ids in filters.items():
+        queryset = queryset.filter(**{f'{DIMENSIONS[dimension][source][0]}__in': ids})
+
+    # Selected under their column names and renamed afterwards: values()
+    # can't alias over a model field such as user or day
+    renames = {}
+    for dimension in group_by:
+        id_column, label_column = DIMENSIONS[dimension][source]
+        renames.update({id_column: dimension, label_column: f'{dimension}_name'})
+    periods = {'period_start': PERIODS[period][source]()} if period else {}
+
+    rows = (
+        queryset.order_by().values(*renames, **periods)
+        .annotate(total_hours=Sum('hours'), total_entries=Count('id') if by_task else Sum('entries'))
+        .filter(total_entries__gt=0)
+        .order_by(*periods, *renames)
+    )
+    results = []
+    for values in rows:
+        result = {period: values['period_start']} if period else {}
+        result.update((renames[column], values[column]) for column in renames)
+        result.update(hours=values['total_hours'], entries=values['total_entries'])
+        results.append(result)
+    return results
@@ -2,8 +2,9 @@ from rest_framework import serializers
 from .models import TimeLog
 from projects.models import Task
 from accounts.models import User
+from core.serializers import SparseFieldsetMixin
 
-class TimeLogSerializer(serializers.ModelSerializer):
+class TimeLogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_username = serializers.CharField(source='user.username', read_only=True)
     task_title = serializers.CharField(source='task.title', read_only=True)
     
@@ -11,6 +12,6 @@ class TimeLogSerializer(serializers.ModelSerializer):
         model = TimeLog
         fields = [
             'id', 'task', 'task_title', 'user', 'user_username',
-            'hours', 'description', 'created_at'
+            'hours', 'description', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'user'] 
\ No newline at end of file
+        read_only_fields = ['created_at', 'updated_at', 'user'] 
\ No newline at end of file
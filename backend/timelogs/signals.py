@@ -0,0 +1,81 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from core import cascades
+from core.cascades import deleted_with
+from projects.models import Project, Task
+from . import rollups
+from .models import TimeLog, TimeLogDaily
+
+ROLLUP_FIELDS = {'task', 'task_id', 'user', 'user_id', 'hours', 'created_at'}
+
+cascades.track(Task)
+
+
+@receiver(pre_save, sender=TimeLog)
+def remember_rollup_row(sender, instance, update_fields=None, **kwargs):
+    # Read back from the database rather than trusting the loaded instance,
+    # which may be deferred or stale
+    instance._rollup_before = None
+    if instance._state.adding or (update_fields is not None and not ROLLUP_FIELDS & set(update_fields)):
+        return
+    instance._rollup_before = (
+        TimeLog.objects.filter(pk=instance.pk)
+        .values_list('task__project_id', 'user_id', 'created_at', 'hours')
+        .first()
+    )
+
+
+@receiver(post_save, sender=TimeLog)
+def update_rollup(sender, instance, created, **kwargs):
+    before = getattr(instance, '_rollup_before', None)
+    if not created and before is None:
+        return
+    rollups.apply([
+        before and rollups.row(*before, -1),
+        rollups.row(instance.task.project_id, instance.user_id, instance.created_at, instance.hours, 1),
+    ])
+
+
+@receiver(post_delete, sender=TimeLog)
+def subtract_from_rollup(sender, instance, origin=None, **kwargs):
+    model = deleted_with(origin)
+    if model is Project:
+        # The project's rollup rows go with it
+        return
+    if model is Task:
+        # Subtracted with the task rows, after which the task's project is known
+        cascades.defer(origin, instance, subtract_task_logs,
+                       ('log', instance.task_id, instance.user_id, instance.created_at, instance.hours))
+        return
+    project_id = Task.objects.filter(pk=instance.task_id).values_list('project_id', flat=True).first()
+    rollups.apply([rollups.row(project_id, instance.user_id, instance.created_at, instance.hours, -1)])
+
+
+@receiver(post_delete, sender=Task)
+def subtract_task_from_rollup(sender, instance, origin=None, **kwargs):
+    if deleted_with(origin) is Task:
+        cascades.defer(origin, instance, subtract_task_logs, ('task', instance.pk, instance.project_id))
+
+
+def subtract_task_logs(items):
+    # The logs of every task in one delete() come off the rollup in one upsert
+    projects, logs = {}, []
+    for kind, task_id, *values in items:
+        if kind == 'task':
+            projects[task_id] = values[0]
+        else:
+            logs.append((task_id, *values))
+    rollups.apply([rollups.row(projects.get(task_id), *log, -1) for task_id, *log in logs])
+
+
+@receiver(post_delete, sender=Project)
+def delete_project_rollup(sender, instance, **kwargs):
+    TimeLogDaily.objects.filter(project_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=User)
+def delete_user_rollup(sender, instance, **kwargs):
+    # The user's logs stay with user set to null, which no rollup row holds
+    TimeLogDaily.objects.filter(user_id=instance.pk).delete()
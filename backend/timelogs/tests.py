@@ -1,3 +1,85 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.db.models import Sum
+
+from accounts.models import User
+from core.testing import APITestCase
+from projects.models import Project, Task
+from .models import TimeLog, TimeLogDaily
+
+
+class TimeLogQueryTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role='admin')
+        cls.developer = User.objects.create_user('dev', password='x', role='developer')
+        project = Project.objects.create(name='P', owner=cls.admin)
+        cls.tasks = [
+            Task.objects.create(title=f'Task {i}', project=project, assigned_to=cls.developer) for i in range(4)
+        ]
+        cls.logs = [
+            TimeLog.objects.create(task=task, user=user, hours='2.00')
+            for task in cls.tasks[:3] for user in (cls.admin, cls.developer)
+        ]
+
+    def test_list(self):
+        for user in (self.admin, self.developer):
+            client = self.client_for(user)
+            with self.assertMaxQueries(4):
+                self.assertEqual(client.get('/api/timelogs/').status_code, 200)
+
+    def test_anonymous_requests_are_refused(self):
+        client = self.client_for(None)
+        self.assertEqual(client.get('/api/timelogs/').status_code, 401)
+        self.assertEqual(client.post('/api/timelogs/', {'task': self.tasks[3].pk, 'hours': '1.25'}).status_code, 401)
+
+    def test_create(self):
+        client = self.client_for(self.developer)
+        with self.assertMaxQueries(6):
+            response = client.post('/api/timelogs/', {'task': self.tasks[3].pk, 'hours': '1.25'})
+        self.assertEqual(response.status_code, 201)
+
+    def test_update(self):
+        client = self.client_for(self.developer)
+        log = self.logs[1]
+        url = f'/api/timelogs/{log.pk}/'
+        with self.assertMaxQueries(7):
+            self.assertEqual(client.put(url, {'task': log.task_id, 'hours': '3.00'}).status_code, 200)
+        with self.assertMaxQueries(6):
+            self.assertEqual(client.patch(url, {'hours': '4.00'}).status_code, 200)
+
+    def test_destroy(self):
+        client = self.client_for(self.developer)
+        with self.assertMaxQueries(6):
+            response = client.delete(f'/api/timelogs/{self.logs[1].pk}/')
+        self.assertEqual(response.status_code, 204)
+
+
+class TimeLogRollupTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role='admin')
+        cls.developer = User.objects.create_user('dev', password='x', role='developer')
+        cls.project = Project.objects.create(name='P', owner=cls.admin)
+        cls.tasks = [Task.objects.create(title=f'Task {i}', project=cls.project) for i in range(12)]
+        for task in cls.tasks:
+            for user in (cls.admin, cls.developer):
+                TimeLog.objects.create(task=task, user=user, hours='1.50')
+
+    def total_hours(self):
+        return TimeLogDaily.objects.aggregate(hours=Sum('hours'))['hours']
+
+    def test_bulk_delete_subtracts_every_tasks_logs_in_one_upsert(self):
+        client = self.client_for(self.admin)
+        doomed = [task.pk for task in self.tasks[:11]]
+        with self.assertMaxQueries(17) as queries:
+            response = client.post('/api/projects/tasks/bulk/', {'delete': doomed}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Task.objects.filter(pk__in=doomed).exists())
+        upserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "timelogs_timelogdaily"')]
+        self.assertEqual(len(upserts), 1)
+        self.assertEqual(self.total_hours(), Decimal('3.00'))
+
+    def test_task_delete_subtracts_its_logs(self):
+        self.tasks[0].delete()
+        self.assertEqual(self.total_hours(), Decimal('33.00'))
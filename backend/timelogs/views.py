@@ -1,25 +1,29 @@
-from rest_framework import viewsets, permissions, status
+from datetime import timedelta
+
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django.db import IntegrityError
+from django.utils import timezone
+from core.mixins import ConditionalGetMixin, EagerLoadingMixin, QueryBudgetMixin
+from core.permissions import PolicyPermission
+from projects.filters import parse_datetime_param
+from . import rollups
 from .models import TimeLog
+from .permissions import TimeLogPolicy
 from .serializers import TimeLogSerializer
 from accounts.models import User
 
-class IsAdminManagerOrOwner(permissions.BasePermission):
-    def has_permission(self, request, view):
-        # Allow authenticated users to create timelogs
-        return request.user and request.user.is_authenticated
-    
-    def has_object_permission(self, request, view, obj):
-        user = request.user
-        if user.role in ['admin', 'manager']:
-            return True
-        return obj.user == user
-
-class TimeLogViewSet(viewsets.ModelViewSet):
+class TimeLogViewSet(QueryBudgetMixin, ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = TimeLog.objects.all().order_by('-created_at')
     serializer_class = TimeLogSerializer
-    permission_classes = [permissions.IsAuthenticated, IsAdminManagerOrOwner]
+    permission_classes = [PolicyPermission]
+    access_policy = TimeLogPolicy()
+    # task_title comes from the task row
+    last_modified_related = ['task']
+    report_default_days = 30
+    report_max_days = 731
 
     def create(self, request, *args, **kwargs):
         # Check if user has already logged time for this task
@@ -42,7 +46,60 @@ class TimeLogViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role in ['admin', 'manager']:
-            return TimeLog.objects.all()
-        return TimeLog.objects.filter(user=user)
+        return self.access_policy.filter_queryset(TimeLog.objects.all(), self.request.user)
+
+    @action(detail=False, methods=['get'])
+    def report(self, request):
+        """
+        Hours logged between the dates ``?from=`` and ``?to=`` (the last
+        ``report_default_days`` days by default), grouped by the comma
+        separated ``?group_by=`` dimensions (user, team, project, task) and
+        by ``?period=`` (day, week or month). ``?user=``, ``?team=``,
+        ``?project=`` and ``?task=`` narrow it to comma separated ids.
+        Users other than admins and managers only see their own hours.
+        """
+        params = request.query_params
+        end = timezone.localdate()
+        if params.get('to'):
+            end = timezone.localdate(parse_datetime_param(params['to'], 'to'))
+        start = end - timedelta(days=self.report_default_days - 1)
+        if params.get('from'):
+            start = timezone.localdate(parse_datetime_param(params['from'], 'from'))
+        if end < start:
+            raise ValidationError({'to': 'Must not be before from.'})
+        if (end - start).days >= self.report_max_days:
+            raise ValidationError({'from': f'Range spans more than {self.report_max_days} days.'})
+
+        group_by = list(dict.fromkeys(value.strip() for value in params.get('group_by', '').split(',') if value.strip()))
+        if any(dimension not in rollups.DIMENSIONS for dimension in group_by):
+            raise ValidationError({'group_by': f"Must be among: {', '.join(rollups.DIMENSIONS)}."})
+        period = params.get('period') or None
+        if period is not None and period not in rollups.PERIODS:
+            raise ValidationError({'period': f"Must be one of: {', '.join(rollups.PERIODS)}."})
+        filters = {
+            dimension: self.parse_ids(params[dimension], dimension)
+            for dimension in rollups.DIMENSIONS if params.get(dimension)
+        }
+
+        rows = rollups.report(
+            group_by, period, start, end,
+            scope=self.access_policy.get_scope(request.user), filters=filters,
+        )
+        total = sum(row['hours'] for row in rows)
+        for row in rows:
+            # Rendered like TimeLogSerializer renders hours
+            row['hours'] = f"{row['hours']:.2f}"
+        return Response({
+            'from': start,
+            'to': end,
+            'group_by': group_by,
+            'period': period,
+            'total_hours': f'{total:.2f}',
+            'results': rows,
+        })
+
+    def parse_ids(self, value, name):
+        try:
+            return [int(part) for part in value.split(',') if part.strip()]
+        except ValueError:
+            raise ValidationError({name: 'Must be comma separated integer ids.'})
@@ -20,22 +20,15 @@ const Dashboard = () => {
 
   const fetchDashboardData = async () => {
     try {
-      // Fetch projects and tasks based on user role
-      const [projectsRes, tasksRes] = await Promise.all([
-        axios.get('/projects/projects/'),
-        axios.get('/projects/tasks/')
-      ]);
-
-      const projects = projectsRes.data;
-      const tasks = tasksRes.data;
-      const completedTasks = tasks.filter(task => task.status === 'done').length;
-      const pendingTasks = tasks.filter(task => task.status !== 'done').length;
+      // Counts are scoped to the user's role on the server
+      const response = await axios.get('/projects/stats/');
+      const data = response.data;
 
       setStats({
-        projects: projects.length,
-        tasks: tasks.length,
-        completedTasks,
-        pendingTasks
+        projects: data.projects,
+        tasks: data.tasks,
+        completedTasks: data.completed_tasks,
+        pendingTasks: data.pending_tasks
       });
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
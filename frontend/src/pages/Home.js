@@ -34,19 +34,13 @@ const Home = () => {
   const fetchQuickStats = async () => {
     try {
       setLoading(true);
-      const [projectsRes, tasksRes] = await Promise.all([
-        axios.get('/projects/projects/'),
-        axios.get('/projects/tasks/')
-      ]);
-      
-      const projects = projectsRes.data;
-      const tasks = tasksRes.data;
-      const completedTasks = tasks.filter(task => task.status === 'done').length;
+      const response = await axios.get('/projects/stats/');
+      const data = response.data;
       
       setQuickStats({
-        projects: projects.length,
-        tasks: tasks.length,
-        completedTasks
+        projects: data.projects,
+        tasks: data.tasks,
+        completedTasks: data.completed_tasks
       });
     } catch (error) {
       console.error('Error fetching stats:', error);